@@ -1,45 +1,74 @@
-import whisper
-import sounddevice as sd
-import numpy as np
-import scipy.io.wavfile as wav
 import os
 import time
 import json
 import sys
-import torch
+from concurrent.futures import ThreadPoolExecutor
 from colorama import Fore, Style
 
 # Import core modules
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from core.speaker_embed import SpeakerEncoder
+from core import capture, asr_engine, vad
+from core.speaker_registry import SpeakerRegistry
+from core.streaming_asr import StreamingTranscriber
+from core.speak import detect_language
 
 CONFIG_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "voice_config.json")
 
+# Decode profiles (voice_config.json "asr_profile")
+DECODE_PROFILES = {
+    # Whisper defaults: language detection, temperature fallback, conditioning on previous text
+    "accurate": {"pin_language": False, "quantize": False, "options": {}},
+    # One greedy (or asr_beam_size) pass in a known language, int8 Linear layers on CPU
+    "fast": {"pin_language": True, "quantize": True,
+             "options": {"temperature": 0.0, "condition_on_previous_text": False}},
+}
+DEFAULT_PROFILE = "accurate"
+
+def load_asr(model_size=None):
+    """Loads the ASR engine chosen in voice_config.json (asr_backend / asr_model)."""
+    return asr_engine.load_engine(model_size=model_size)
+
 class AdaptiveEar:
-    def __init__(self, model_size="small"):
+    def __init__(self, model_size=None, asr_model=None, speaker_encoder=None):
+        """
+        asr_model / speaker_encoder may be passed in preloaded (see core/startup.py);
+        otherwise they are loaded here. asr_model is a core.asr_engine engine.
+        """
         self.config = self._load_config()
         self.model_size = model_size
         
-        print(f"{Fore.YELLOW}[ADAPTIVE] Loading Whisper '{model_size}' + Speaker Encoder...{Style.RESET_ALL}")
-        
-        # Load Whisper
-        # Use CUDA if available for speed. Fallback to CPU.
-        device = "cuda" if torch.cuda.is_available() else "cpu"
-        print(f"{Fore.YELLOW}[ADAPTIVE] Whisper Device: {device.upper()}{Style.RESET_ALL}")
-        self.asr_model = whisper.load_model(model_size, device=device)
-        self.device = device
+        # Load ASR engine (openai-whisper or faster-whisper, see core/asr_engine.py)
+        self.asr_model = asr_model if asr_model is not None else load_asr(model_size)
+        self.device = self.asr_model.device
         
         # Load Speaker Encoder
-        self.speaker_encoder = SpeakerEncoder()
+        self.speaker_encoder = speaker_encoder if speaker_encoder is not None else SpeakerEncoder()
         
-        # Load User Profile
-        self.profile_path = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 
-                                       self.config.get("enrollment_file", "user_profile.npy"))
-        self.user_embedding = self._load_profile()
-        
-        # Adaptation params
-        self.similarity_threshold = self.config.get("similarity_threshold", 0.25)
-        self.adaptation_rate = self.config.get("adaptation_rate", 0.05)
+        # Load enrolled speakers (thresholds, adaptation rates and prompts are per speaker)
+        self.speakers = SpeakerRegistry(self.config)
+        if len(self.speakers):
+            print(f"{Fore.BLUE}[ADAPTIVE] Speakers loaded: {', '.join(self.speakers.names)}{Style.RESET_ALL}")
+
+        # Decode profile
+        self.profile = self.config.get("asr_profile", DEFAULT_PROFILE)
+        if self.profile not in DECODE_PROFILES:
+            print(f"{Fore.YELLOW}[ADAPTIVE] Unknown asr_profile '{self.profile}', using {DEFAULT_PROFILE}.{Style.RESET_ALL}")
+            self.profile = DEFAULT_PROFILE
+        self.beam_size = self.config.get("asr_beam_size", 1)      # fast profile: 1 = greedy
+        self.language = self.config.get("asr_language")            # Pins every turn if set
+        self.last_language = "en"                                  # Script of the previous transcript
+        if DECODE_PROFILES[self.profile]["quantize"]:
+            self.asr_model.quantize()
+        print(f"{Fore.BLUE}[ADAPTIVE] Decode profile: {self.profile}{Style.RESET_ALL}")
+
+        # Transcribe while recording (see core/streaming_asr.py)
+        self.streaming = self.config.get("asr_streaming", True)
+        self.last_speaker = None  # Picks the prompt for interim / speculative decodes
+
+        # Whisper runs here while ECAPA verifies on the calling thread
+        self._pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="ear-asr")
+        self.stats = {"turns": 0, "speculation_hits": 0, "speculation_misses": 0, "saved_seconds": 0.0}
         
         print(f"{Fore.GREEN}[ADAPTIVE] System Ready.{Style.RESET_ALL}")
 
@@ -49,102 +78,114 @@ class AdaptiveEar:
                 return json.load(f)
         return {}
 
-    def _load_profile(self):
-        if os.path.exists(self.profile_path):
-            try:
-                emb = np.load(self.profile_path)
-                print(f"{Fore.BLUE}[ADAPTIVE] User profile loaded.{Style.RESET_ALL}")
-                return emb
-            except Exception as e:
-                print(f"{Fore.RED}[ADAPTIVE] Failed to load profile: {e}{Style.RESET_ALL}")
-        return None
-
-    def listen(self, timeout=10):
+    def listen(self, timeout=10, start_block=None, lead_in_end=None, skip=None):
         """
         Record and Transcribe with Speaker Adaptation.
+        start_block: capture block to start from (wake-word pre-roll). Audio already
+        buffered since then is consumed first, so timing is counted in audio seconds.
+        lead_in_end: first block after the wake phrase; speech before it doesn't
+        count towards the endpoint timing.
+        skip: (first, end) capture blocks left out entirely (e.g. while the earcon played).
         """
         SAMPLE_RATE = 16000
-        THRESHOLD = 300  # More sensitive mic
-        SILENCE_LIMIT = 2.5 # Wait longer for user to finish thought
+        block_seconds = capture.BLOCK_SIZE / SAMPLE_RATE
         
         print(f"{Fore.BLUE}[ADAPTIVE] Listening...{Style.RESET_ALL}")
         
-        audio_buffer = []
-        silence_start = time.time()
-        recording_start = time.time()
-        has_spoken = False
+        recording = capture.RecordingBuffer(sample_rate=SAMPLE_RATE)
+        recorded = 0.0
+        streamer = None
+        endpointer = vad.Endpointer(block_seconds=block_seconds)
         
-        with sd.InputStream(samplerate=SAMPLE_RATE, channels=1, dtype='int16') as stream:
+        with capture.subscribe("asr", start_block=start_block) as stream:
+            # Noise floor from the couple of seconds before this turn
+            first = stream.next_block
+            endpointer.calibrate(stream.engine.copy_blocks(first - capture.blocks_for(2.0), first), capture.BLOCK_SIZE)
             while True:
-                if not has_spoken and (time.time() - recording_start > timeout):
+                if not endpointer.has_speech and not endpointer.lead_in_speech and recorded > timeout:
+                    if streamer is not None:
+                        streamer.close()  # Opened by a click the endpointer then discarded
                     return None
                 
-                data, overflow = stream.read(1024)
-                audio_chunk = data.flatten()
-                audio_buffer.append(audio_chunk)
+                audio_chunk = stream.read(timeout=0.5)
+                if audio_chunk is None:
+                    continue
+                if skip is not None and skip[0] <= stream.next_block - 1 < skip[1]:
+                    continue
+                level = recording.append(audio_chunk)  # Scaled to float32 in place, RMS on the way
+                recorded += block_seconds
+                if streamer is not None:
+                    streamer.notify()
+                if recorded >= capture.MAX_RECORD_SECONDS:
+                    break
                 
-                volume = np.linalg.norm(audio_chunk) / len(audio_chunk)
-                
-                # feedback
-                # bars = "█" * int(volume // 50)
-                # sys.stdout.write(f"\r{Fore.CYAN}[REC] {bars:<10} {Style.RESET_ALL}")
-                # sys.stdout.flush()
-
-                if volume > THRESHOLD:
-                    silence_start = time.time()
-                    has_spoken = True
+                if lead_in_end is not None and stream.next_block <= lead_in_end:
+                    ended = False
+                    endpointer.prime(audio_chunk, level)
                 else:
-                    if has_spoken and (time.time() - silence_start > SILENCE_LIMIT):
-                        break
+                    ended = endpointer.update(audio_chunk, streamer.partial_text() if streamer else None, level)
+
+                if endpointer.in_speech and streamer is None and self.streaming:
+                    # Speech started: decode in the background from a little before it
+                    streamer = StreamingTranscriber(self.asr_model, recording,
+                                                    offset=recording.tail(4 * capture.BLOCK_SIZE),
+                                                    prompt=self._prompt(self.last_speaker),
+                                                    options=self._decode_options(self.last_speaker))
+                if ended:
+                    break
         
+        silence = endpointer.silence_seconds
+        ep = endpointer.get_stats()
         # Process Audio
-        print(f"\n{Fore.CYAN}[ADAPTIVE] Processing...{Style.RESET_ALL}")
-        full_audio = np.concatenate(audio_buffer)
+        print(f"\n{Fore.CYAN}[ADAPTIVE] Processing... (endpoint after {silence:.1f}s silence, "
+              f"{ep['speech_seconds']:.1f}s speech){Style.RESET_ALL}")
+        # One float32 buffer for both ECAPA and Whisper (no temp WAV, no concatenate, no copy)
+        full_audio = recording.view()
         
-        # Save temp for tool usage
-        temp_file = "temp_adaptive.wav"
-        wav.write(temp_file, SAMPLE_RATE, full_audio)
-        
-        user_identified = False
-        similarity = 0.0
-        
-        # 1. Speaker Verification / Adaptation
-        if self.user_embedding is not None:
-            # Extract current embedding
-            current_emb = self.speaker_encoder.embed_file(temp_file)
-            
-            if current_emb is not None:
-                # Compare
-                similarity = self.speaker_encoder.compute_similarity(current_emb, self.user_embedding)
-                print(f"{Fore.MAGENTA}[ADAPTIVE] Speaker Similarity: {similarity:.4f}{Style.RESET_ALL}")
-                
-                if similarity > self.similarity_threshold:
-                    user_identified = True
-                    # Gradual Adaptation
-                    self._update_profile(current_emb)
+        # Verification and transcription run side by side: Whisper starts right away with the
+        # prompt of the last verified speaker and is only re-run if the verdict differs
+        start = time.time()
+        speculative = self.last_speaker
+        asr_future = self._pool.submit(self._transcribe, full_audio, self._prompt(speculative), streamer, silence,
+                                       speaker=speculative)
+
+        # 1. Speaker Identification / Adaptation
+        speaker, current_emb, verify_seconds = self._verify(full_audio, SAMPLE_RATE)
+        if speaker:
+            # Gradual Adaptation (at that speaker's rate)
+            self.speakers.adapt(speaker, current_emb)
+        self.last_speaker = speaker
 
         # 2. Transcribe with Bias
-        # Simplified prompt: Focus on VOCABULARY, not instructions.
-        tanglish_vocab = "A1, pannu, seiyu, enna, irukku, open, close, update, system, terminal, firefox, code, install, weather, news."
-        
-        if user_identified:
-            print(f"{Fore.GREEN}[ADAPTIVE] Verified. Using Tanglish bias.{Style.RESET_ALL}")
-            prompt = f"Conversational Tamil English. Tanglish. Vocab: {tanglish_vocab}"
+        if speaker:
+            print(f"{Fore.GREEN}[ADAPTIVE] Verified: {speaker}. Using their prompt.{Style.RESET_ALL}")
         else:
             print(f"{Fore.YELLOW}[ADAPTIVE] Standard Mode.{Style.RESET_ALL}")
-            prompt = f"English. Vocab: {tanglish_vocab}"
 
+        # The speculative decode is only valid if it used the same prompt and options
+        same = self._prompt(speaker) == self._prompt(speculative) and \
+            self._decode_options(speaker) == self._decode_options(speculative)
         try:
-            # Use FP16 if on CUDA for speed and memory savings
-            use_fp16 = (self.device == "cuda")
-            result = self.asr_model.transcribe(temp_file, fp16=use_fp16, initial_prompt=prompt)
-            text = result["text"].strip()
-            
-            if os.path.exists(temp_file):
-                os.remove(temp_file)
+            text, asr_seconds = asr_future.result()
+            if same:
+                self.stats["speculation_hits"] += 1
+            else:
+                self.stats["speculation_misses"] += 1
+                text, retry_seconds = self._transcribe(full_audio, self._prompt(speaker), streamer, silence,
+                                                       speaker=speaker, retry=True)
+                asr_seconds += retry_seconds
+            if text:
+                self.last_language = detect_language(text)
+
+            wall = time.time() - start
+            saved = verify_seconds + asr_seconds - wall
+            self.stats["turns"] += 1
+            self.stats["saved_seconds"] += saved
+            print(f"{Fore.CYAN}[ADAPTIVE] Verify {verify_seconds:.2f}s + ASR {asr_seconds:.2f}s in {wall:.2f}s wall "
+                  f"(saved {saved:.2f}s, speculation {'hit' if same else 'miss'}){Style.RESET_ALL}")
                 
             if text:
-                prefix = f"{Fore.GREEN}[USER (Verified)]" if user_identified else f"{Fore.MAGENTA}[USER]"
+                prefix = f"{Fore.GREEN}[USER ({speaker})]" if speaker else f"{Fore.MAGENTA}[USER]"
                 print(f"{prefix}: {text}{Style.RESET_ALL}")
                 return text
                 
@@ -153,21 +194,77 @@ class AdaptiveEar:
             
         return None
 
-    def _update_profile(self, new_emb):
+    def _verify(self, audio, sample_rate):
+        """Returns (speaker name or None, embedding, seconds) for the recorded utterance."""
+        t0 = time.time()
+        # Speakers enrolled while running arrive through the registry's refresh thread
+        if not len(self.speakers):
+            return None, None, 0.0
+        # Extract current embedding
+        current_emb = self.speaker_encoder.embed_array(audio, sample_rate)
+        if current_emb is None:
+            return None, None, time.time() - t0
+        # Compare against every enrolled voice at once
+        speaker, similarity = self.speakers.identify(current_emb)
+        print(f"{Fore.MAGENTA}[ADAPTIVE] Speaker Similarity: {similarity:.4f} ({speaker or 'unknown'}){Style.RESET_ALL}")
+        return speaker, current_emb, time.time() - t0
+
+    def _transcribe(self, audio, prompt, streamer=None, trailing_silence=0.0, speaker=None, retry=False):
         """
-        Mix new embedding into profile with low alpha.
+        Returns (text, seconds). With a streamer only its uncommitted tail is decoded,
+        unless this is a retry after a wrong speaker guess: then the words it committed
+        with the guessed prompt and options are decoded again.
         """
-        try:
-            self.user_embedding = self.speaker_encoder.update_listing_embedding(
-                self.user_embedding, new_emb, alpha=self.adaptation_rate
-            )
-            # Save (maybe throttle this in production to avoid disk I/O every time)
-            np.save(self.profile_path, self.user_embedding)
-            # print(f"{Fore.BLACK}[DEBUG] Profile updated.{Style.RESET_ALL}")
-        except Exception as e:
-            print(f"Update failed: {e}")
+        t0 = time.time()
+        if streamer is not None:
+            # Most words were committed while the user was talking; decode the tail only
+            text = streamer.finish(prompt, trailing_silence=trailing_silence,
+                                   options=self._decode_options(speaker), restart=retry)
+            st = streamer.get_stats()
+            print(f"{Fore.CYAN}[ADAPTIVE] Streamed {st['committed_words']} words during speech, "
+                  f"final tail {st['tail_seconds']:.1f}s decoded in {st['final_seconds']:.2f}s "
+                  f"(utterance {st['audio_seconds']:.1f}s){Style.RESET_ALL}")
+        else:
+            result = self.asr_model.transcribe(audio, initial_prompt=prompt,
+                                               **self._decode_options(speaker))
+            text = result["text"].strip()
+        return text, time.time() - t0
+
+    def get_stats(self):
+        s = dict(self.stats)
+        s["avg_saved_seconds"] = s["saved_seconds"] / s["turns"] if s["turns"] else 0.0
+        return s
+
+    def _decode_options(self, speaker):
+        """Engine options for the active profile (language pin, beam, fallback)."""
+        profile = DECODE_PROFILES[self.profile]
+        options = dict(profile["options"])
+        if profile["pin_language"]:
+            # Explicit pin > enrolled speaker's language > script of the last transcript
+            speaker_language = self.speakers.get(speaker)["language"] if speaker else None
+            if self.language:
+                options["language"] = self.language
+            elif speaker_language:
+                options["language"] = speaker_language
+            else:
+                options["language"] = self.last_language
+        if self.profile == "fast" and self.beam_size and self.beam_size > 1:
+            options["beam_size"] = self.beam_size
+        return options
+
+    def _prompt(self, speaker):
+        """Whisper initial prompt. Simplified: focus on VOCABULARY, not instructions."""
+        tanglish_vocab = "A1, pannu, seiyu, enna, irukku, open, close, update, system, terminal, firefox, code, install, weather, news."
+        if speaker:
+            # Enrolled voices can set their own prompt (voice_enroll.py --prompt)
+            return self.speakers.get(speaker)["prompt"] or f"Conversational Tamil English. Tanglish. Vocab: {tanglish_vocab}"
+        return f"English. Vocab: {tanglish_vocab}"
+
+    def close(self):
+        """Writes any pending speaker-profile updates."""
+        self.speakers.close()
 
 if __name__ == "__main__":
-    ear = AdaptiveEar(model_size="base.en")
+    ear = AdaptiveEar()
     while True:
         ear.listen()
@@ -0,0 +1,227 @@
+"""
+A1 ASR Engines
+One interface over the speech-to-text backends, selected in voice_config.json:
+
+    "asr_backend": "whisper"          openai-whisper (PyTorch, CUDA if available)
+    "asr_backend": "faster-whisper"   CTranslate2, int8 on CPU (float16 on CUDA)
+    "asr_model":   "small"            model size / name for either backend
+    "asr_threads": 4                  intra-op CPU threads (0 = library default)
+
+Every engine takes float32 16 kHz audio and returns the same dict as
+whisper.transcribe ("text", "language", "segments" with optional "words"),
+and initial_prompt biasing is passed through unchanged, so callers don't
+care which backend is loaded.
+
+`python -m core.asr_engine --rtf sample.wav [model]` prints a side-by-side
+real-time-factor report for the installed backends.
+"""
+
+import os
+import sys
+import json
+import time
+import numpy as np
+from colorama import Fore, Style
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CONFIG_PATH = os.path.join(BASE_DIR, "voice_config.json")
+SAMPLE_RATE = 16000
+
+DEFAULT_BACKEND = "whisper"
+DEFAULT_MODEL = "small"
+
+# Options both backends understand; anything else is dropped with a warning
+COMMON_OPTIONS = ("language", "temperature", "beam_size", "best_of",
+                  "condition_on_previous_text", "initial_prompt", "word_timestamps")
+
+def load_config():
+    if os.path.exists(CONFIG_PATH):
+        with open(CONFIG_PATH, 'r') as f:
+            return json.load(f)
+    return {}
+
+class ASREngine:
+    """Base class. Subclasses set name/device/model_size and implement _transcribe()."""
+    name = "base"
+
+    def __init__(self, model_size):
+        self.model_size = model_size
+        self.device = "cpu"
+
+    def transcribe(self, audio, **options):
+        """
+        audio: float32 mono samples at 16 kHz.
+        options: any of COMMON_OPTIONS.
+        Returns {"text", "language", "segments": [{"start", "end", "text", "words"?}]}.
+        """
+        unknown = set(options) - set(COMMON_OPTIONS)
+        if unknown:
+            print(f"{Fore.YELLOW}[ASR] {self.name} ignoring options: {', '.join(sorted(unknown))}{Style.RESET_ALL}")
+            options = {k: v for k, v in options.items() if k in COMMON_OPTIONS}
+        audio = np.ascontiguousarray(audio, dtype=np.float32)
+        return self._transcribe(audio, **options)
+
+    def _transcribe(self, audio, **options):
+        raise NotImplementedError
+
+    def quantize(self):
+        """Switches to int8 weights where the backend supports it. Returns True if the model is int8."""
+        return False
+
+    def __repr__(self):
+        return f"{self.name}:{self.model_size}@{self.device}"
+
+class WhisperEngine(ASREngine):
+    """openai-whisper (PyTorch)."""
+    name = "whisper"
+
+    def __init__(self, model_size=DEFAULT_MODEL, device=None, cpu_threads=0):
+        super().__init__(model_size)
+        import torch
+        import whisper
+        if cpu_threads:
+            # Process-wide: also applies to the other torch models (ECAPA, XTTS)
+            torch.set_num_threads(cpu_threads)
+        self.device = device or ("cuda" if torch.cuda.is_available() else "cpu")
+        self.model = whisper.load_model(model_size, device=self.device)
+        self.quantized = False
+
+    def _transcribe(self, audio, **options):
+        # FP16 only helps (and only works) on CUDA
+        return self.model.transcribe(audio, fp16=(self.device == "cuda"), **options)
+
+    def quantize(self):
+        """Dynamic int8 quantization of the Linear layers (CPU only; activations stay fp32)."""
+        if self.quantized or self.device != "cpu":
+            return self.quantized
+        import torch
+        import whisper.model
+        start = time.time()
+        # whisper's Linear subclass only adds a dtype cast in forward(); quantize_dynamic
+        # matches exact types, so hand it plain nn.Linear modules
+        for module in self.model.modules():
+            if type(module) is whisper.model.Linear:
+                module.__class__ = torch.nn.Linear
+        self.model = torch.quantization.quantize_dynamic(self.model, {torch.nn.Linear}, dtype=torch.qint8)
+        self.quantized = True
+        print(f"{Fore.GREEN}[ASR] Quantized Linear layers to int8 in {time.time() - start:.1f}s.{Style.RESET_ALL}")
+        return True
+
+class FasterWhisperEngine(ASREngine):
+    """faster-whisper (CTranslate2). int8 weights on CPU."""
+    name = "faster-whisper"
+
+    def __init__(self, model_size=DEFAULT_MODEL, device=None, compute_type=None, cpu_threads=0):
+        super().__init__(model_size)
+        from faster_whisper import WhisperModel
+        if device is None:
+            try:
+                import ctranslate2
+                device = "cuda" if ctranslate2.get_cuda_device_count() > 0 else "cpu"
+            except Exception:
+                device = "cpu"
+        self.device = device
+        self.compute_type = compute_type or ("float16" if device == "cuda" else "int8")
+        self.model = WhisperModel(model_size, device=device, compute_type=self.compute_type,
+                                  cpu_threads=cpu_threads)
+
+    def _transcribe(self, audio, **options):
+        # Match openai-whisper's greedy default (faster-whisper defaults to beam 5)
+        options.setdefault("beam_size", 1)
+        segments, info = self.model.transcribe(audio, **options)
+        out = []
+        for seg in segments:  # Generator: decoding happens while iterating
+            entry = {"start": seg.start, "end": seg.end, "text": seg.text}
+            if seg.words is not None:
+                entry["words"] = [{"word": w.word, "start": w.start, "end": w.end,
+                                   "probability": w.probability} for w in seg.words]
+            out.append(entry)
+        return {
+            "text": "".join(seg["text"] for seg in out),
+            "language": info.language,
+            "segments": out,
+        }
+
+    def quantize(self):
+        # compute_type is fixed at load time ("asr_compute_type")
+        return "int8" in self.compute_type
+
+ENGINES = {
+    WhisperEngine.name: WhisperEngine,
+    FasterWhisperEngine.name: FasterWhisperEngine,
+}
+
+def load_engine(backend=None, model_size=None, config=None):
+    """
+    Builds the configured engine. Falls back to openai-whisper if the
+    requested backend isn't installed.
+    """
+    config = load_config() if config is None else config
+    backend = backend or config.get("asr_backend", DEFAULT_BACKEND)
+    model_size = model_size or config.get("asr_model", DEFAULT_MODEL)
+    if backend not in ENGINES:
+        print(f"{Fore.YELLOW}[ASR] Unknown backend '{backend}', using {DEFAULT_BACKEND}.{Style.RESET_ALL}")
+        backend = DEFAULT_BACKEND
+
+    kwargs = {"cpu_threads": config.get("asr_threads", 0)}
+    if backend == FasterWhisperEngine.name:
+        kwargs["compute_type"] = config.get("asr_compute_type")
+
+    start = time.time()
+    print(f"{Fore.YELLOW}[ASR] Loading {backend} '{model_size}'...{Style.RESET_ALL}")
+    try:
+        engine = ENGINES[backend](model_size, **kwargs)
+    except ImportError as e:
+        if backend == DEFAULT_BACKEND:
+            raise
+        print(f"{Fore.YELLOW}[ASR] {backend} not installed ({e}); using {DEFAULT_BACKEND}.{Style.RESET_ALL}")
+        engine = ENGINES[DEFAULT_BACKEND](model_size, cpu_threads=kwargs["cpu_threads"])
+    print(f"{Fore.GREEN}[ASR] {engine} ready in {time.time() - start:.1f}s.{Style.RESET_ALL}")
+    return engine
+
+def _load_wav(path):
+    """Reads a 16 kHz mono 16-bit WAV as float32."""
+    import wave
+    with wave.open(path, "rb") as w:
+        if w.getframerate() != SAMPLE_RATE or w.getnchannels() != 1 or w.getsampwidth() != 2:
+            raise ValueError(f"{path}: need 16 kHz mono 16-bit PCM")
+        pcm = np.frombuffer(w.readframes(w.getnframes()), dtype=np.int16)
+    return pcm.astype(np.float32) / 32768.0
+
+def rtf_report(audio, model_size=None, backends=None, prompt=None, runs=3):
+    """
+    Transcribes the same audio with each backend and prints the real-time factor
+    (decode time / audio duration, lower is faster). The first run is a warm-up.
+    """
+    duration = len(audio) / SAMPLE_RATE
+    results = {}
+    for backend in backends or list(ENGINES):
+        try:
+            engine = ENGINES[backend](model_size or DEFAULT_MODEL)
+        except ImportError as e:
+            print(f"{Fore.YELLOW}[ASR RTF] {backend}: not installed ({e}){Style.RESET_ALL}")
+            continue
+        engine.transcribe(audio, initial_prompt=prompt)  # Warm-up
+        times = []
+        for _ in range(runs):
+            start = time.time()
+            result = engine.transcribe(audio, initial_prompt=prompt)
+            times.append(time.time() - start)
+        best = min(times)
+        results[backend] = {"device": engine.device, "rtf": best / duration,
+                            "seconds": best, "text": result["text"].strip()}
+
+    print(f"{Fore.CYAN}[ASR RTF] {duration:.1f}s of audio, model '{model_size or DEFAULT_MODEL}'{Style.RESET_ALL}")
+    print(f"{Fore.CYAN}    {'backend':<16} {'device':<6} {'best':>8} {'RTF':>6}  text{Style.RESET_ALL}")
+    for backend, r in results.items():
+        print(f"    {backend:<16} {r['device']:<6} {r['seconds']:7.2f}s {r['rtf']:6.3f}  {r['text'][:60]}")
+    return results
+
+if __name__ == "__main__":
+    if "--rtf" in sys.argv:
+        idx = sys.argv.index("--rtf")
+        path = sys.argv[idx + 1]
+        model = sys.argv[idx + 2] if len(sys.argv) > idx + 2 else None
+        rtf_report(_load_wav(path), model_size=model)
+    else:
+        print("Usage: python -m core.asr_engine --rtf sample.wav [model]")
@@ -4,6 +4,7 @@ import time
 import os
 import asyncio
 import re
+import ast
 from colorama import Fore, Style
 from dotenv import load_dotenv
 from core.memory import memory
@@ -146,12 +147,98 @@ def call_llm(model_tier, prompt, system_prompt):
         return f"Brain Error: {e}"
     return "Error."
 
+def stream_llm(model_tier, prompt, system_prompt):
+    """
+    Like call_llm, but yields the response as it is generated.
+    Only the local Ollama tier streams; other tiers yield the full reply once.
+    """
+    if model_tier != 'local':
+        yield call_llm(model_tier, prompt, system_prompt)
+        return
+
+    print(f"{Fore.GREEN}[BRAIN] Streaming from LOCAL ({LOCAL_MODEL})...{Style.RESET_ALL}")
+    req = {
+        "model": LOCAL_MODEL,
+        "prompt": f"System: {system_prompt}\nUser: {prompt}",
+        "stream": True,
+        "options": {"num_ctx": 4096}
+    }
+    start = time.time()
+    first_token = None
+    try:
+        with requests.post(API_URL, json=req, stream=True, timeout=60) as res:
+            if res.status_code != 200:
+                yield "Error."
+                return
+            # Ollama streams one JSON object per line
+            for line in res.iter_lines():
+                if not line:
+                    continue
+                chunk = json.loads(line)
+                token = chunk.get("response", "")
+                if token:
+                    if first_token is None:
+                        first_token = time.time() - start
+                        print(f"{Fore.GREEN}[BRAIN] First token in {first_token:.2f}s{Style.RESET_ALL}")
+                    yield token
+                if chunk.get("done"):
+                    break
+    except Exception as e:
+        yield f"Brain Error: {e}"
+        return
+    print(f"{Fore.GREEN}[BRAIN] Local generated in {time.time()-start:.2f}s{Style.RESET_ALL}")
+
+# --- TOOL CALLS ---
+TOOL_CALL_PATTERN = re.compile(r"\[\[CALL:(\w+)\((.*?)\)\]\]", re.DOTALL)
+
+def parse_tool_args(t_args_str):
+    """
+    Parses the argument text of a [[CALL:...]] block.
+    Returns a dict, or None if the LLM produced something unparseable.
+    """
+    t_args_str = t_args_str.strip()
+    if not t_args_str:
+        return {}
+    try:
+        # Fix common LLM mistakes (like q="val")
+        # 1. Try pure JSON
+        return json.loads(t_args_str)
+    except:
+        pass
+    try:
+        # 2. Try Python literal (handles single quotes or q="val" if formatted as dict)
+        if "=" in t_args_str and ":" not in t_args_str:
+            # transform key="val" -> {"key": "val"}
+            t_args_str = f"dict({t_args_str})"
+        return ast.literal_eval(t_args_str)
+    except:
+        return None
+
+async def run_tool_call(t_def, t_name, t_args_str):
+    """Executes one parsed tool call and returns its observation text."""
+    t_args = parse_tool_args(t_args_str)
+    if t_args is None:
+        print(f"{Fore.RED}[TOOL ERROR] Could not parse args: {t_args_str}{Style.RESET_ALL}")
+        return f"Could not parse arguments: {t_args_str}"
+    try:
+        result = await mcp_manager.call_tool(t_def['server'], t_name, t_args)
+    except Exception as e:
+        print(f"{Fore.RED}[TOOL ERROR] {e}{Style.RESET_ALL}")
+        return f"Tool Execution Error: {e}"
+    print(f"{Fore.YELLOW}[TOOL] {t_name} result: {str(result)[:100]}...{Style.RESET_ALL}")
+    return result
+
 # --- TOOL USE LOOP ---
-async def think_async(prompt):
+async def think_async(prompt, on_token=None):
     """
     ReAct Loop:
     1. Check if tools needed.
     2. Loop: Thought -> Action -> Observation -> Thought
+
+    If on_token is given, every LLM turn is streamed and each token is
+    passed to it as it arrives (e.g. speak.StreamingSpeaker.feed). While tools
+    are available a turn may be a tool call, so its tokens are only passed on
+    once the turn has finished without one (prose around a [[CALL:...]] is never spoken).
     """
     global history
     print(f"{Fore.CYAN}[BRAIN] Thinking...{Style.RESET_ALL}")
@@ -191,11 +278,21 @@ If no tool is needed or relevant, just answer the user directly.
     # 4. Agent Loop (Max 3 turns)
     current_prompt = prompt
     for turn in range(3):
-        response = call_llm(tier, current_prompt, full_system)
+        held = []
+        if on_token:
+            response = ""
+            for token in stream_llm(tier, current_prompt, full_system):
+                if mcp_tools:
+                    held.append(token)
+                else:
+                    on_token(token)
+                response += token
+        else:
+            response = call_llm(tier, current_prompt, full_system)
         
-        # Check for tool call
-        tool_match = re.search(r"\[\[CALL:(\w+)\((.*)\)\]\]", response, re.DOTALL)
-        if tool_match:
+        # Check for tool calls (an LLM turn may request several)
+        calls = []
+        for tool_match in TOOL_CALL_PATTERN.finditer(response):
             t_name = tool_match.group(1)
             t_args_str = tool_match.group(2)
             print(f"{Fore.YELLOW}[TOOL] Detected call: {t_name}({t_args_str}){Style.RESET_ALL}")
@@ -203,38 +300,26 @@ If no tool is needed or relevant, just answer the user directly.
             # Find server
             t_def = next((t for t in mcp_tools if t['name'] == t_name), None)
             if t_def:
-                try:
-                    # Clean args
-                    # This implies valid JSON, heuristic parsing might be needed for loose LLMs
-                    import ast
-                    try:
-                        # Fix common LLM mistakes (like q="val")
-                        # 1. Try pure JSON
-                        t_args = json.loads(t_args_str)
-                    except:
-                        try:
-                            # 2. Try Python literal (handles single quotes or q="val" if formatted as dict)
-                            if "=" in t_args_str and ":" not in t_args_str:
-                                # transform key="val" -> {"key": "val"}
-                                t_args_str = f"dict({t_args_str})"
-                            
-                            t_args = ast.literal_eval(t_args_str)
-                        except:
-                            print(f"{Fore.RED}[TOOL ERROR] Could not parse args: {t_args_str}{Style.RESET_ALL}")
-                            continue
-                        
-                    result = await mcp_manager.call_tool(t_def['server'], t_name, t_args)
-                    print(f"{Fore.YELLOW}[TOOL] Result: {str(result)[:100]}...{Style.RESET_ALL}")
-                    
-                    # Feed back to LLM
-                    current_prompt += f"\n\n[TOOL EXECUTION]\nCall: {t_name}\nResult: {result}\n\nContinue answering the user."
-                    continue # Re-loop
-                except Exception as e:
-                    print(f"{Fore.RED}[TOOL ERROR] {e}{Style.RESET_ALL}")
+                calls.append((t_def, t_name, t_args_str))
             else:
                 print(f"{Fore.RED}[TOOL] Unknown tool: {t_name}{Style.RESET_ALL}")
+
+        if calls:
+            # Run all calls together; gather keeps results in call order
+            start = time.time()
+            results = await asyncio.gather(*(run_tool_call(*c) for c in calls))
+            print(f"{Fore.YELLOW}[TOOL] {len(calls)} call(s) finished in {time.time()-start:.2f}s{Style.RESET_ALL}")
+            
+            # Feed back to LLM
+            current_prompt += "\n\n[TOOL EXECUTION]"
+            for (_, t_name, _), result in zip(calls, results):
+                current_prompt += f"\nCall: {t_name}\nResult: {result}\n"
+            current_prompt += "\nContinue answering the user."
+            continue # Re-loop
         
         # No tool call, final answer
+        for token in held:
+            on_token(token)
         # Update history
         history.append({"role": "user", "content": prompt})
         history.append({"role": "assistant", "content": response})
@@ -246,5 +331,5 @@ If no tool is needed or relevant, just answer the user directly.
     return response
 
 # Synchronous wrapper for main.py
-def think(prompt):
-    return asyncio.run(think_async(prompt))
+def think(prompt, on_token=None):
+    return asyncio.run(think_async(prompt, on_token))
@@ -0,0 +1,266 @@
+"""
+A1 Audio Capture Engine
+Owns the one microphone stream (16 kHz mono int16) for the whole process.
+
+The PortAudio callback writes fixed-size blocks into a preallocated ring
+buffer. Consumers (wake word, ASR, barge-in) each hold a Subscription with
+their own read cursor and get read-only views into the ring, so fanning out
+to several listeners never copies audio.
+
+A view stays valid until the ring wraps (RING_SECONDS); copy it if you need
+to keep it longer. A subscriber that falls more than a ring behind skips
+ahead and its `dropped` counter records the lost blocks.
+"""
+
+import threading
+import time
+import numpy as np
+import sounddevice as sd
+from colorama import Fore, Style
+
+SAMPLE_RATE = 16000
+BLOCK_SIZE = 1600       # 100 ms per block
+RING_SECONDS = 30       # Longest stretch a subscriber may hold views for
+MAX_RECORD_SECONDS = 25 # Recorders stop here so their views are never overwritten
+
+class Subscription:
+    """One consumer's cursor into the ring. Use as a context manager."""
+    def __init__(self, engine, name, next_block):
+        self.engine = engine
+        self.name = name
+        self.next_block = next_block  # Sequence number of the next block to read
+        self.dropped = 0              # Blocks overwritten before this subscriber read them
+        self.closed = False
+
+    def pending(self):
+        """Blocks written but not yet read."""
+        return self.engine.blocks_written - self.next_block
+
+    def read(self, timeout=None):
+        """
+        Returns the next block as a read-only int16 view, or None on timeout.
+        Blocks until audio is available.
+        """
+        engine = self.engine
+        with engine._cond:
+            if engine.blocks_written <= self.next_block:
+                if not engine._cond.wait_for(lambda: engine.blocks_written > self.next_block or self.closed,
+                                             timeout):
+                    return None
+                if self.closed:
+                    return None
+            behind = engine.blocks_written - self.next_block
+            if behind >= engine.ring_blocks:
+                # Lapped: the oldest unread block is being (or was) overwritten
+                lost = behind - engine.ring_blocks + 1
+                self.dropped += lost
+                engine.stats["dropped_blocks"] += lost
+                self.next_block += lost
+            view = engine._block_view(self.next_block)
+            self.next_block += 1
+        return view
+
+    def close(self):
+        self.closed = True
+        self.engine._unsubscribe(self)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+class AudioCapture:
+    def __init__(self, sample_rate=SAMPLE_RATE, block_size=BLOCK_SIZE, ring_seconds=RING_SECONDS, device=None):
+        self.sample_rate = sample_rate
+        self.block_size = block_size
+        self.device = device
+        self.ring_blocks = max(2, int(ring_seconds * sample_rate / block_size))
+        self.ring = np.zeros(self.ring_blocks * block_size, dtype=np.int16)
+        self.blocks_written = 0
+        self.stream = None
+        self.subscribers = []
+        self._cond = threading.Condition()
+        self.stats = {
+            "blocks": 0,
+            "overflows": 0,        # PortAudio input overflows (the driver lost audio)
+            "dropped_blocks": 0,   # Blocks a slow subscriber never saw
+            "callback_errors": 0,
+        }
+
+    def start(self):
+        if self.stream is not None:
+            return
+        self.stream = sd.InputStream(samplerate=self.sample_rate, blocksize=self.block_size,
+                                     device=self.device, channels=1, dtype='int16',
+                                     callback=self._callback)
+        self.stream.start()
+        print(f"{Fore.GREEN}[CAPTURE] Microphone open ({self.sample_rate} Hz, "
+              f"{self.block_size * 1000 // self.sample_rate} ms blocks, "
+              f"{self.ring_blocks * self.block_size / self.sample_rate:.0f}s ring).{Style.RESET_ALL}")
+
+    def stop(self):
+        if self.stream is None:
+            return
+        try:
+            self.stream.stop()
+            self.stream.close()
+        finally:
+            self.stream = None
+            with self._cond:
+                for sub in self.subscribers:
+                    sub.closed = True
+                self._cond.notify_all()
+
+    def _callback(self, indata, frames, time_info, status):
+        if status.input_overflow:
+            self.stats["overflows"] += 1
+        if frames != self.block_size:
+            # Fixed blocksize is requested, so this should never happen
+            self.stats["callback_errors"] += 1
+            return
+        slot = self.blocks_written % self.ring_blocks
+        start = slot * self.block_size
+        self.ring[start:start + self.block_size] = indata[:, 0]
+        with self._cond:
+            self.blocks_written += 1
+            self.stats["blocks"] += 1
+            self._cond.notify_all()
+
+    def _block_view(self, seq):
+        start = (seq % self.ring_blocks) * self.block_size
+        view = self.ring[start:start + self.block_size]
+        view.flags.writeable = False
+        return view
+
+    def copy_blocks(self, first, end):
+        """
+        Copies blocks [first, end) out of the ring as one int16 array.
+        Blocks that have already been overwritten are left out.
+        """
+        with self._cond:
+            first = max(first, self.blocks_written - self.ring_blocks + 1, 0)
+            end = min(end, self.blocks_written)
+            if end <= first:
+                return np.zeros(0, dtype=np.int16)
+            return np.concatenate([self._block_view(seq) for seq in range(first, end)])
+
+    def subscribe(self, name, start_block=None):
+        """
+        Starts a new consumer at the current write position, or at start_block
+        (an earlier position, e.g. for pre-roll) if it is still in the ring.
+        """
+        self.start()
+        with self._cond:
+            oldest = max(0, self.blocks_written - self.ring_blocks + 1)
+            first = self.blocks_written if start_block is None else min(max(start_block, oldest), self.blocks_written)
+            sub = Subscription(self, name, first)
+            self.subscribers.append(sub)
+        return sub
+
+    def _unsubscribe(self, sub):
+        with self._cond:
+            if sub in self.subscribers:
+                self.subscribers.remove(sub)
+            self._cond.notify_all()
+
+    def get_stats(self):
+        with self._cond:
+            s = dict(self.stats)
+            s["subscribers"] = [sub.name for sub in self.subscribers]
+        s["seconds_captured"] = s["blocks"] * self.block_size / self.sample_rate
+        return s
+
+class RecordingBuffer:
+    """
+    One utterance, recorded block by block into a preallocated float32 array
+    that doubles when full. Samples are scaled to [-1, 1) as they are written,
+    so Whisper and ECAPA take view() directly (no list of chunks, no final
+    concatenate). The RMS of each block (int16 scale) is computed in place on
+    write for the VAD.
+
+    Single writer. Readers on other threads may call view() at any time: samples
+    below `length` never change, and a view taken before a grow keeps the old array.
+    """
+    def __init__(self, seconds=10, sample_rate=SAMPLE_RATE):
+        self.sample_rate = sample_rate
+        self.data = np.empty(int(seconds * sample_rate), dtype=np.float32)
+        self.length = 0
+        self.grows = 0
+
+    def _grow(self, needed):
+        grown = np.empty(max(needed, 2 * len(self.data)), dtype=np.float32)
+        grown[:self.length] = self.data[:self.length]
+        self.data = grown
+        self.grows += 1
+
+    def append(self, block):
+        """Appends an int16 (or float32) block; returns its RMS on the int16 scale."""
+        n = len(block)
+        end = self.length + n
+        if end > len(self.data):
+            self._grow(end)
+        out = self.data[self.length:end]
+        if block.dtype == np.int16:
+            np.multiply(block, 1.0 / 32768.0, out=out, casting="unsafe")
+        else:
+            out[:] = block
+        level = float(np.sqrt(np.dot(out, out) / n)) * 32768.0 if n else 0.0
+        self.length = end  # Published last: readers only look below length
+        return level
+
+    def view(self, start=0, end=None):
+        """Zero-copy float32 view of samples [start, end). Treat as read-only."""
+        end = self.length if end is None else min(end, self.length)
+        return self.data[start:end]
+
+    def tail(self, samples):
+        """Sample offset `samples` back from the end (clamped to 0)."""
+        return max(0, self.length - samples)
+
+    @property
+    def seconds(self):
+        return self.length / self.sample_rate
+
+_capture = None
+_capture_lock = threading.Lock()
+
+def get_capture(device=None):
+    """Returns the process-wide capture engine, opening the microphone on first use."""
+    global _capture
+    with _capture_lock:
+        if _capture is None:
+            _capture = AudioCapture(device=device)
+    _capture.start()
+    return _capture
+
+def subscribe(name, start_block=None):
+    return get_capture().subscribe(name, start_block=start_block)
+
+def current_block():
+    """Number of the next block the shared engine will write."""
+    return get_capture().blocks_written
+
+def blocks_for(seconds):
+    """Number of capture blocks covering `seconds` of audio."""
+    return int(round(seconds * SAMPLE_RATE / BLOCK_SIZE))
+
+def get_stats():
+    """Counters of the shared engine, or None if the microphone was never opened."""
+    return _capture.get_stats() if _capture is not None else None
+
+def stop():
+    if _capture is not None:
+        _capture.stop()
+
+if __name__ == "__main__":
+    # Prints levels for a few seconds, then the counters
+    with subscribe("meter") as sub:
+        end = time.time() + 5
+        while time.time() < end:
+            block = sub.read(timeout=1)
+            if block is not None:
+                volume = np.linalg.norm(block) / len(block)
+                print(f"{'█' * int(volume // 50):<20} {volume:8.1f}")
+    print(get_capture().get_stats())
+    stop()
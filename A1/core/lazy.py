@@ -0,0 +1,135 @@
+"""
+A1 Lazy Imports
+Defers heavy modules (torch, whisper, speechbrain, qdrant, skills...) until
+their first attribute access, and profiles what importing main.py costs.
+
+    adaptive_asr = lazy_import("core.adaptive_asr")   # nothing imported yet
+    adaptive_asr.load_asr()                            # imported here
+
+`python main.py --import-profile` re-imports main in a fresh interpreter with
+-X importtime, prints the most expensive top-level imports, and fails if any
+module in HEAVY_MODULES was imported eagerly.
+"""
+
+import os
+import sys
+import json
+import time
+import types
+import threading
+import importlib
+import subprocess
+from colorama import Fore, Style
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Must never be pulled in just by importing main.py
+HEAVY_MODULES = [
+    "torch", "torchaudio", "whisper", "speechbrain", "TTS", "piper",
+    "faster_whisper", "ctranslate2",
+    "qdrant_client", "duckduckgo_search", "feedparser", "pyautogui",
+    "pynput", "mcp", "noisereduce", "scipy",
+]
+
+# name -> seconds spent importing it on first use
+load_times = {}
+
+class LazyModule(types.ModuleType):
+    """Placeholder module that imports the real one on first attribute access."""
+    def __init__(self, name):
+        super().__init__(name)
+        self.__dict__["_lazy_lock"] = threading.Lock()
+        self.__dict__["_lazy_module"] = None
+
+    def _load(self):
+        module = self.__dict__["_lazy_module"]
+        if module is not None:
+            return module
+        # Two boot threads may touch the same module; only one imports it
+        with self.__dict__["_lazy_lock"]:
+            if self.__dict__["_lazy_module"] is None:
+                start = time.time()
+                self.__dict__["_lazy_module"] = importlib.import_module(self.__name__)
+                load_times[self.__name__] = time.time() - start
+                print(f"{Fore.BLUE}[IMPORT] {self.__name__} loaded in {load_times[self.__name__]:.2f}s{Style.RESET_ALL}")
+            return self.__dict__["_lazy_module"]
+
+    def __getattr__(self, attr):
+        return getattr(self._load(), attr)
+
+    def __dir__(self):
+        return dir(self._load())
+
+def lazy_import(name):
+    """Returns the module if it's already imported, else a LazyModule for it."""
+    module = sys.modules.get(name)
+    if module is not None:
+        return module
+    return LazyModule(name)
+
+def is_loaded(name):
+    """True once a module has really been imported (lazily or not)."""
+    return name in sys.modules
+
+def _parse_importtime(stderr):
+    """
+    Parses `-X importtime` output into (module, self_us, cumulative_us, depth) rows.
+    Nesting depth is encoded as indentation of the module name.
+    """
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        parts = line[len("import time:"):].split("|")
+        if len(parts) != 3:
+            continue
+        try:
+            self_us, cumulative_us = int(parts[0]), int(parts[1])
+        except ValueError:
+            continue  # Header line
+        name = parts[2].rstrip()
+        depth = (len(name) - len(name.lstrip())) // 2
+        rows.append((name.strip(), self_us, cumulative_us, depth))
+    return rows
+
+def import_profile(module="main", top=20):
+    """
+    Imports `module` in a fresh interpreter and reports where the time goes.
+    Returns 0 if no HEAVY_MODULES were imported eagerly, 1 if some were, 2 on import failure.
+    """
+    # os._exit skips atexit handlers (main.py's cleanup would start the overlay)
+    code = (
+        f"import sys, json, os; import {module}; "
+        f"print(json.dumps(sorted(m for m in {HEAVY_MODULES!r} if m in sys.modules))); "
+        "sys.stdout.flush(); os._exit(0)"
+    )
+    start = time.time()
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", code],
+                          cwd=BASE_DIR, capture_output=True, text=True)
+    wall = time.time() - start
+
+    if proc.returncode != 0 or not proc.stdout.strip():
+        print(f"{Fore.RED}[IMPORT] Importing '{module}' failed:{Style.RESET_ALL}")
+        errors = [l for l in proc.stderr.splitlines() if not l.startswith("import time:")]
+        print("\n".join(errors[-15:]))
+        return 2
+
+    rows = _parse_importtime(proc.stderr)
+    top_level = sorted((r for r in rows if r[3] == 0), key=lambda r: r[2], reverse=True)
+    total_us = sum(r[2] for r in top_level)
+
+    print(f"{Fore.CYAN}[IMPORT] 'import {module}': {total_us / 1000:.0f} ms in imports, "
+          f"{wall:.2f}s interpreter wall time, {len(rows)} modules{Style.RESET_ALL}")
+    print(f"{Fore.CYAN}    {'cumulative':>10}  {'self':>8}  module{Style.RESET_ALL}")
+    for name, self_us, cumulative_us, _ in top_level[:top]:
+        print(f"    {cumulative_us / 1000:8.1f}ms  {self_us / 1000:6.1f}ms  {name}")
+
+    eager = json.loads(proc.stdout.strip().splitlines()[-1])
+    if eager:
+        print(f"{Fore.RED}[IMPORT] Heavy modules imported eagerly: {', '.join(eager)}{Style.RESET_ALL}")
+        return 1
+    print(f"{Fore.GREEN}[IMPORT] No heavy modules imported at startup.{Style.RESET_ALL}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(import_profile(sys.argv[1] if len(sys.argv) > 1 else "main"))
@@ -1,55 +1,42 @@
 import json
 import vosk
-import sounddevice as sd
 import sys
-import queue
-import numpy as np
-import noisereduce as nr
+import os
 import time
 from colorama import Fore, Style
 
+# Import core modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from core import capture, text_input
+
 SAMPLE_RATE = 16000
-BLOCK_SIZE = 8000
 
 def listen_for_command(vosk_model, timeout=10):
     """
     Listens for a command.
     """
-    q = queue.Queue()
-
-    def callback(indata, frames, time, status):
-        q.put(bytes(indata))
-
     try:
-        rec = vosk.KaldiRecognizer(vosk_model, 16000)
+        rec = vosk.KaldiRecognizer(vosk_model, SAMPLE_RATE)
         
         # Use int16 directly for Vosk (Simpler, less latency)
-        with sd.RawInputStream(samplerate=16000, blocksize=4000, dtype='int16',
-                               channels=1, callback=callback):
+        with capture.subscribe("listen") as sub:
             
             start_time = time.time()
             print(f"{Fore.CYAN}[LISTEN] Listening...{Style.RESET_ALL}")
             
             while True:
                 # Check for GUI Input (Text)
-                import os
-                if os.path.exists("gui_input.txt"):
-                    try:
-                        with open("gui_input.txt", "r") as f:
-                            text = f.read().strip()
-                        os.remove("gui_input.txt")
-                        if text:
-                            print(f"{Fore.GREEN}        [GUI INPUT]: {text}{Style.RESET_ALL}")
-                            return text
-                    except:
-                        pass
+                text = text_input.poll()
+                if text:
+                    print(f"{Fore.GREEN}        [GUI INPUT]: {text}{Style.RESET_ALL}")
+                    return text
 
                 if time.time() - start_time > timeout:
                     return None
                 
-                if not q.empty():
-                    data = q.get()
-                    if rec.AcceptWaveform(data):
+                data = sub.read(timeout=0.1)
+                if data is not None:
+                    if rec.AcceptWaveform(data.tobytes()):
                         res = json.loads(rec.Result())
                         text = res.get("text", "")
                         if text:
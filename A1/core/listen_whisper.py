@@ -1,27 +1,21 @@
-import whisper
-import sounddevice as sd
-import numpy as np
-import scipy.io.wavfile as wav
 import os
-import time
 from colorama import Fore, Style
 import sys
-import torch
+
+# Import core modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from core import capture, asr_engine, vad
 
 # Configuration
 # 'base' is a good balance. 'small' or 'medium' for better accuracy but slower.
+# Backend (openai-whisper / faster-whisper) comes from voice_config.json "asr_backend".
 MODEL_SIZE = "medium.en" 
 
 class Ear:
     def __init__(self):
-        print(f"{Fore.YELLOW}[WHISPER] Loading model '{MODEL_SIZE}'...{Style.RESET_ALL}")
         try:
-            # Check for CUDA
-            device = "cuda" if torch.cuda.is_available() else "cpu"
-            print(f"{Fore.BLUE}[WHISPER] Using device: {device}{Style.RESET_ALL}")
-            
-            self.model = whisper.load_model(MODEL_SIZE, device=device)
-            print(f"{Fore.GREEN}[WHISPER] Model loaded.{Style.RESET_ALL}")
+            self.model = asr_engine.load_engine(model_size=MODEL_SIZE)
+            print(f"{Fore.BLUE}[WHISPER] Using {self.model}{Style.RESET_ALL}")
         except Exception as e:
             print(f"{Fore.RED}[WHISPER ERROR] Failed to load model: {e}{Style.RESET_ALL}")
             sys.exit(1)
@@ -31,50 +25,49 @@ class Ear:
         Records audio until silence is detected, then transcribes.
         """
         SAMPLE_RATE = 16000
-        THRESHOLD = 500  # Silence threshold (adjust based on mic)
-        SILENCE_LIMIT = 2.0  # Seconds of silence to stop recording
+        block_seconds = capture.BLOCK_SIZE / SAMPLE_RATE
         
         print(f"{Fore.BLUE}[WHISPER] Listening...{Style.RESET_ALL}")
         
-        audio_buffer = []
-        silence_start = time.time()
-        recording_start = time.time()
-        has_spoken = False
+        recording = capture.RecordingBuffer(sample_rate=SAMPLE_RATE)
+        recorded = 0.0
+        endpointer = vad.Endpointer(block_seconds=block_seconds)
         
         # 1. Record
-        with sd.InputStream(samplerate=SAMPLE_RATE, channels=1, dtype='int16') as stream:
+        with capture.subscribe("whisper") as stream:
+            # Noise floor from the second before we started listening
+            first = stream.next_block
+            endpointer.calibrate(stream.engine.copy_blocks(first - capture.blocks_for(1.0), first), capture.BLOCK_SIZE)
             while True:
-                # Global timeout check
-                if not has_spoken and (time.time() - recording_start > timeout):
+                # Global timeout check (audio time)
+                if not endpointer.has_speech and recorded > timeout:
                     return None
                 
                 # Read audio chunk
-                data, overflow = stream.read(1024)
-                audio_chunk = data.flatten()
-                audio_buffer.append(audio_chunk)
+                audio_chunk = stream.read(timeout=0.5)
+                if audio_chunk is None:
+                    continue
+                level = recording.append(audio_chunk)  # Scaled to float32 in place, RMS on the way
+                recorded += block_seconds
+                if recorded >= capture.MAX_RECORD_SECONDS:
+                    break
                 
-                # Calculate volume for VAD (Voice Activity Detection)
-                volume = np.linalg.norm(audio_chunk) / len(audio_chunk)
+                # VAD / endpointing (see core/vad.py)
+                ended = endpointer.update(audio_chunk, level=level)
                 
                 # Visual Feedback
-                bars = "█" * int(volume // 50)
+                bars = "█" * int(endpointer.gate.level // 2000)
                 sys.stdout.write(f"\r{Fore.CYAN}[REC] {bars:<10} {Style.RESET_ALL}")
                 sys.stdout.flush()
 
-                # VAD Logic
-                if volume > THRESHOLD:
-                    silence_start = time.time()
-                    has_spoken = True
-                else:
-                    if has_spoken and (time.time() - silence_start > SILENCE_LIMIT):
-                        break # Stop recording
+                if ended:
+                    break # Stop recording
         
         # 2. Transcribe
         print(f"\n{Fore.CYAN}[WHISPER] Transcribing...{Style.RESET_ALL}")
         
-        # Save temp file
-        full_audio = np.concatenate(audio_buffer)
-        wav.write("temp_command.wav", SAMPLE_RATE, full_audio)
+        # Whisper takes the float32 samples directly (no temp WAV, no ffmpeg decode)
+        full_audio = recording.view()
         
         try:
             # Method A: Language-Model Biasing (Contextual Priming)
@@ -83,13 +76,9 @@ class Ear:
             system_context = "A1 system commands. Linux Arch. Keywords: open firefox, google chrome, vs code, terminal, alacritty, kitty, hyprland, wayland, update system, pacman, yay, install, search weather, news, python, code, script, github, clone, push, pull."
             
             # OpenAI Whisper Transcribe with Context
-            result = self.model.transcribe("temp_command.wav", fp16=False, initial_prompt=system_context)
+            result = self.model.transcribe(full_audio, initial_prompt=system_context)
             text = result["text"].strip()
             
-            # Clean up
-            if os.path.exists("temp_command.wav"):
-                os.remove("temp_command.wav")
-            
             if text:
                 print(f"{Fore.MAGENTA}[USER]: {text}{Style.RESET_ALL}")
                 return text
@@ -1,6 +1,8 @@
 import asyncio
 import os
 import json
+import time
+import threading
 from mcp import ClientSession, StdioServerParameters
 from mcp.client.stdio import stdio_client
 from colorama import Fore, Style
@@ -9,67 +11,358 @@ from colorama import Fore, Style
 # Format: "name": {"command": "...", "args": [...], "env": {...}}
 MCP_CONFIG_FILE = "mcp_config.json"
 
+# Tool Catalog Cache
+# None = never expire (only config changes / restarts invalidate)
+CATALOG_TTL = None
+
+# Session Pool
+CONNECT_TIMEOUT = 30.0         # npx may need to fetch the package on first start
+TOOL_TIMEOUT = 60.0
+DISCOVERY_DEADLINE = 10.0      # per server; a slow server is skipped, not waited on
+HEALTH_INTERVAL = 15.0         # ping idle sessions to notice a dead child
+RECONNECT_BACKOFF = 1.0        # seconds, doubled after every failed attempt
+RECONNECT_BACKOFF_MAX = 30.0
+
+def _server_params(config):
+    return StdioServerParameters(
+        command=config['command'],
+        args=config.get('args', []),
+        env={**os.environ, **config.get('env', {})}
+    )
+
+class ServerSession:
+    """
+    One long-lived, initialized ClientSession for a single MCP server.
+    Owns the child process and reconnects with backoff if it dies.
+    Lives entirely on the pool's event loop.
+    """
+    def __init__(self, name, config, on_connect=None):
+        self.name = name
+        self.config = config
+        self.on_connect = on_connect
+        self.session = None
+        self.connects = 0
+        self._ready = asyncio.Event()
+        self._drop = asyncio.Event()
+        self._closing = False
+        self._task = None
+
+    def start(self):
+        self._task = asyncio.create_task(self._run())
+
+    async def _run(self):
+        backoff = RECONNECT_BACKOFF
+        while not self._closing:
+            try:
+                # The stdio/session contexts must be entered and exited by the same task,
+                # so this task holds them open for the lifetime of the connection.
+                async with stdio_client(_server_params(self.config)) as (read, write):
+                    async with ClientSession(read, write) as session:
+                        start = time.perf_counter()
+                        await asyncio.wait_for(session.initialize(), CONNECT_TIMEOUT)
+                        self.session = session
+                        self.connects += 1
+                        self._drop.clear()
+                        self._ready.set()
+                        backoff = RECONNECT_BACKOFF
+                        print(f"{Fore.BLUE}[MCP] {self.name} connected in {time.perf_counter() - start:.2f}s.{Style.RESET_ALL}")
+                        if self.on_connect:
+                            self.on_connect(self.name, self.connects)
+                        await self._hold(session)
+            except Exception as e:
+                if not self._closing:
+                    print(f"{Fore.RED}[MCP ERROR] {self.name}: {e}{Style.RESET_ALL}")
+            finally:
+                self._ready.clear()
+                self.session = None
+
+            if self._closing:
+                break
+            print(f"{Fore.YELLOW}[MCP] Reconnecting to {self.name} in {backoff:.0f}s...{Style.RESET_ALL}")
+            await asyncio.sleep(backoff)
+            backoff = min(backoff * 2, RECONNECT_BACKOFF_MAX)
+
+    async def _hold(self, session):
+        """Keeps the connection open until dropped, pinging to detect a dead child."""
+        while not self._drop.is_set():
+            try:
+                await asyncio.wait_for(self._drop.wait(), HEALTH_INTERVAL)
+            except asyncio.TimeoutError:
+                try:
+                    await asyncio.wait_for(session.send_ping(), CONNECT_TIMEOUT)
+                except Exception:
+                    print(f"{Fore.YELLOW}[MCP] {self.name} stopped responding.{Style.RESET_ALL}")
+                    return
+
+    async def wait_ready(self, timeout=CONNECT_TIMEOUT):
+        try:
+            await asyncio.wait_for(self._ready.wait(), timeout)
+        except asyncio.TimeoutError:
+            raise ConnectionError(f"{self.name} is not connected")
+        return self.session
+
+    def drop(self):
+        """Closes the current connection; the run loop reconnects."""
+        self._drop.set()
+
+    async def close(self):
+        self._closing = True
+        self._drop.set()
+        if self._task is None:
+            return
+        if not self._ready.is_set():
+            # Connecting or backing off - nothing to drain
+            self._task.cancel()
+        try:
+            await asyncio.wait_for(self._task, 5)
+        except BaseException:
+            pass
+
+class SessionPool:
+    """
+    Keeps one ServerSession per configured server alive on a dedicated
+    background event loop, so tool calls don't pay for process startup.
+    Coroutines are scheduled onto the loop with run().
+    """
+    def __init__(self, on_connect=None):
+        self.on_connect = on_connect
+        self.sessions = {}
+        self.loop = None
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def _ensure_loop(self):
+        with self._lock:
+            if self.loop is None:
+                self.loop = asyncio.new_event_loop()
+                self._thread = threading.Thread(target=self.loop.run_forever, name="mcp-pool", daemon=True)
+                self._thread.start()
+            return self.loop
+
+    def run(self, coro):
+        """Schedules a coroutine on the pool loop. Returns a concurrent Future."""
+        return asyncio.run_coroutine_threadsafe(coro, self._ensure_loop())
+
+    async def sync(self, servers):
+        """Starts/stops sessions so they match the server config."""
+        for name in list(self.sessions):
+            if servers.get(name) != self.sessions[name].config:
+                await self.sessions.pop(name).close()
+        for name, config in servers.items():
+            if name not in self.sessions:
+                session = ServerSession(name, config, self.on_connect)
+                session.start()
+                self.sessions[name] = session
+
+    def _get(self, name):
+        session = self.sessions.get(name)
+        if session is None:
+            raise ConnectionError(f"{name} has no session")
+        return session
+
+    async def list_tools(self, name):
+        server = self._get(name)
+        session = await server.wait_ready()
+        try:
+            result = await asyncio.wait_for(session.list_tools(), CONNECT_TIMEOUT)
+        except Exception:
+            server.drop()
+            raise
+        return result.tools
+
+    async def call_tool(self, name, tool_name, arguments):
+        server = self._get(name)
+        session = await server.wait_ready()
+        try:
+            return await asyncio.wait_for(session.call_tool(tool_name, arguments), TOOL_TIMEOUT)
+        except Exception:
+            # Tool-level failures come back as results; an exception means the transport broke
+            server.drop()
+            raise
+
+    def shutdown(self, timeout=10):
+        """Closes every session (terminating the children) and stops the loop."""
+        with self._lock:
+            loop, self.loop = self.loop, None
+        if loop is None:
+            return
+
+        async def _close_all():
+            await asyncio.gather(*(s.close() for s in self.sessions.values()), return_exceptions=True)
+            self.sessions.clear()
+
+        try:
+            asyncio.run_coroutine_threadsafe(_close_all(), loop).result(timeout)
+        except Exception as e:
+            print(f"{Fore.RED}[MCP ERROR] Shutdown: {e}{Style.RESET_ALL}")
+        loop.call_soon_threadsafe(loop.stop)
+        self._thread.join(timeout=2)
+
 class MCPManager:
-    def __init__(self):
+    def __init__(self, catalog_ttl=CATALOG_TTL):
         self.servers = {}
         self.tools = []
+        self.catalog_ttl = catalog_ttl
+        self._catalog_ready = False
+        self._catalog_time = 0.0
+        self._config_mtime = None
+        self.stats = {
+            "cold_discoveries": 0,
+            "cold_time": 0.0,
+            "warm_hits": 0,
+            "warm_time": 0.0,
+        }
+        self.pool = SessionPool(on_connect=self._on_server_connect)
+        self._pool_servers = None
+        self._missing = set()   # servers that missed the last discovery deadline
         self._load_config()
 
     def _load_config(self):
+        self.servers = {}
+        self._config_mtime = None
         if os.path.exists(MCP_CONFIG_FILE):
             with open(MCP_CONFIG_FILE, 'r') as f:
                 self.servers = json.load(f)
+            self._config_mtime = os.path.getmtime(MCP_CONFIG_FILE)
+
+    def _config_changed(self):
+        """True if mcp_config.json was edited (or removed) since it was loaded."""
+        try:
+            mtime = os.path.getmtime(MCP_CONFIG_FILE)
+        except OSError:
+            mtime = None
+        return mtime != self._config_mtime
 
-    async def list_tools(self):
+    def invalidate(self, reason=""):
         """
-        Connects to all servers and aggregates tools.
-        Returns a list of tool definitions.
+        Drops the cached tool catalog. The next list_tools() rediscovers.
+        Call this when a server restarts or its tool set may have changed.
         """
-        self.tools = []
-        for name, config in self.servers.items():
-            print(f"{Fore.BLUE}[MCP] Connecting to {name}...{Style.RESET_ALL}")
-            try:
-                server_params = StdioServerParameters(
-                    command=config['command'],
-                    args=config.get('args', []),
-                    env={**os.environ, **config.get('env', {})}
-                )
-                
-                async with stdio_client(server_params) as (read, write):
-                    async with ClientSession(read, write) as session:
-                        await session.initialize()
-                        result = await session.list_tools()
-                        for tool in result.tools:
-                            # Tag tool with server name for routing
-                            t_def = tool.model_dump()
-                            t_def['server'] = name 
-                            self.tools.append(t_def)
-            except Exception as e:
-                print(f"{Fore.RED}[MCP ERROR] {name}: {e}{Style.RESET_ALL}")
+        if self._catalog_ready:
+            print(f"{Fore.BLUE}[MCP] Tool catalog invalidated{f' ({reason})' if reason else ''}.{Style.RESET_ALL}")
+        self._catalog_ready = False
+
+    def _catalog_is_fresh(self):
+        if not self._catalog_ready:
+            return False
+        if self._config_changed():
+            self._load_config()
+            self.invalidate("config changed")
+            return False
+        if self.catalog_ttl is not None and (time.time() - self._catalog_time) > self.catalog_ttl:
+            self.invalidate("TTL expired")
+            return False
+        return True
+
+    async def list_tools(self, refresh=False):
+        """
+        Returns the aggregated tool catalog.
+        Served from cache when warm; connects to all servers only on a cold
+        lookup (first call, refresh=True, config change, restart or TTL).
+        """
+        start = time.perf_counter()
+        if not refresh and self._catalog_is_fresh():
+            self.stats["warm_hits"] += 1
+            self.stats["warm_time"] += time.perf_counter() - start
+            return self.tools
+
+        tools = await self._discover_tools()
+        self.tools = tools
+        self._catalog_ready = True
+        self._catalog_time = time.time()
+
+        elapsed = time.perf_counter() - start
+        self.stats["cold_discoveries"] += 1
+        self.stats["cold_time"] += elapsed
+        print(f"{Fore.BLUE}[MCP] Tool catalog ready: {len(tools)} tools in {elapsed:.2f}s{Style.RESET_ALL}")
         return self.tools
 
+    def warm_up(self):
+        """Fills the tool catalog (blocking). Intended for startup."""
+        return asyncio.run(self.list_tools(refresh=True))
+
+    def get_stats(self):
+        """Catalog cache counters with average cold/warm lookup cost in ms."""
+        s = dict(self.stats)
+        s["avg_cold_ms"] = (s["cold_time"] / s["cold_discoveries"] * 1000) if s["cold_discoveries"] else 0.0
+        s["avg_warm_ms"] = (s["warm_time"] / s["warm_hits"] * 1000) if s["warm_hits"] else 0.0
+        return s
+
+    def _on_server_connect(self, name, connects):
+        """Called from the pool loop whenever a server (re)connects."""
+        if connects > 1:
+            self.invalidate(f"{name} restarted")
+        elif name in self._missing:
+            self.invalidate(f"{name} came online")
+
+    async def _on_pool(self, coro):
+        """Runs a coroutine on the session pool's loop and awaits it from this loop."""
+        return await asyncio.wrap_future(self.pool.run(coro))
+
+    async def _ensure_sessions(self):
+        if self._pool_servers is not self.servers:
+            self._pool_servers = self.servers
+            await self._on_pool(self.pool.sync(self.servers))
+
+    async def _discover_server(self, name):
+        print(f"{Fore.BLUE}[MCP] Connecting to {name}...{Style.RESET_ALL}")
+        start = time.perf_counter()
+        try:
+            tools = await asyncio.wait_for(self._on_pool(self.pool.list_tools(name)), DISCOVERY_DEADLINE)
+        except asyncio.TimeoutError:
+            print(f"{Fore.YELLOW}[MCP] {name} missed the {DISCOVERY_DEADLINE:.0f}s discovery deadline, skipping.{Style.RESET_ALL}")
+            return name, None
+        except Exception as e:
+            print(f"{Fore.RED}[MCP ERROR] {name}: {e}{Style.RESET_ALL}")
+            return name, None
+        print(f"{Fore.BLUE}[MCP] {name}: {len(tools)} tools in {time.perf_counter() - start:.2f}s{Style.RESET_ALL}")
+        return name, tools
+
+    async def _discover_tools(self):
+        """
+        Aggregates tools from all servers concurrently over their pooled sessions.
+        Each server gets DISCOVERY_DEADLINE; one slow server doesn't hold up the rest.
+        Returns a list of tool definitions in config order.
+        """
+        await self._ensure_sessions()
+        results = await asyncio.gather(*(self._discover_server(name) for name in self.servers))
+
+        tools = []
+        missing = set()
+        for name, server_tools in results:
+            if server_tools is None:
+                missing.add(name)
+                continue
+            for tool in server_tools:
+                # Tag tool with server name for routing
+                t_def = tool.model_dump()
+                t_def['server'] = name 
+                tools.append(t_def)
+        self._missing = missing
+        return tools
+
     async def call_tool(self, server_name, tool_name, arguments):
         """
-        Connects to specific server and executes tool.
+        Executes a tool over the server's pooled session.
         """
         config = self.servers.get(server_name)
         if not config:
             return f"Server {server_name} not found."
 
         try:
-             server_params = StdioServerParameters(
-                command=config['command'],
-                args=config.get('args', []),
-                env={**os.environ, **config.get('env', {})}
-            )
-             async with stdio_client(server_params) as (read, write):
-                async with ClientSession(read, write) as session:
-                    await session.initialize()
-                    result = await session.call_tool(tool_name, arguments)
-                    return result.content[0].text
+            await self._ensure_sessions()
+            start = time.perf_counter()
+            result = await self._on_pool(self.pool.call_tool(server_name, tool_name, arguments))
+            print(f"{Fore.BLUE}[MCP] {server_name}.{tool_name} took {time.perf_counter() - start:.2f}s{Style.RESET_ALL}")
+            return result.content[0].text
         except Exception as e:
             return f"Tool Execution Error: {e}"
 
+    def shutdown(self):
+        """Terminates all MCP server children. Safe to call more than once."""
+        self.pool.shutdown()
+        self._pool_servers = None
+
 # Global instance
 manager = MCPManager()
 
@@ -86,7 +379,18 @@ if __name__ == "__main__":
             }, f, indent=2)
             print("Created example mcp_config.json")
     
-    tools = asyncio.run(manager.list_tools())
+    async def _bench():
+        tools = await manager.list_tools()
+        for _ in range(100):
+            await manager.list_tools()
+        return tools
+
+    tools = asyncio.run(_bench())
     print("\nAvailable Tools:")
     for t in tools:
         print(f"- {t['name']} ({t['server']}): {t['description']}")
+
+    stats = manager.get_stats()
+    print(f"\nCatalog: cold {stats['avg_cold_ms']:.1f} ms ({stats['cold_discoveries']}x), "
+          f"warm {stats['avg_warm_ms']:.4f} ms ({stats['warm_hits']}x)")
+    manager.shutdown()
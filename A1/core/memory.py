@@ -2,9 +2,8 @@ import os
 import time
 import requests
 import uuid
+import threading
 from typing import List, Dict, Any
-from qdrant_client import QdrantClient
-from qdrant_client.models import Distance, VectorParams, PointStruct
 from colorama import Fore, Style
 
 # Configuration
@@ -17,6 +16,7 @@ VECTOR_SIZE = 768  # nomic-embed-text is 768d
 class MemorySystem:
     def __init__(self):
         print(f"{Fore.CYAN}[MEMORY] Initializing Qdrant Memory System...{Style.RESET_ALL}")
+        from qdrant_client import QdrantClient  # Heavy; only paid when memory is first used
         # Initialize local Qdrant instance
         self.client = QdrantClient(path=MEMORY_PATH)
         
@@ -25,6 +25,7 @@ class MemorySystem:
 
     def _init_collection(self):
         """Creates the collection if it doesn't exist."""
+        from qdrant_client.models import Distance, VectorParams
         try:
             collections = self.client.get_collections().collections
             exists = any(c.name == COLLECTION_NAME for c in collections)
@@ -76,6 +77,7 @@ class MemorySystem:
         }
         
         point_id = str(uuid.uuid4())
+        from qdrant_client.models import PointStruct
         
         try:
             self.client.upsert(
@@ -125,6 +127,10 @@ class MemorySystem:
             print(f"{Fore.RED}[MEMORY ERROR] Search failed: {e}{Style.RESET_ALL}")
             return []
 
+    def warm_up(self):
+        """Forces Ollama to load the embedding model so the first query doesn't pay for it."""
+        return bool(self._get_embedding("warm up"))
+
     def get_stats(self):
         try:
             info = self.client.get_collection(COLLECTION_NAME)
@@ -132,6 +138,22 @@ class MemorySystem:
         except:
             return None
 
-# Global instance
-memory = MemorySystem()
+_memory = None
+_memory_lock = threading.Lock()
+
+def get_memory():
+    """Returns the shared MemorySystem, opening Qdrant on first call."""
+    global _memory
+    with _memory_lock:
+        if _memory is None:
+            _memory = MemorySystem()
+    return _memory
+
+class _LazyMemory:
+    """Stands in for the global instance so importing this module doesn't open Qdrant."""
+    def __getattr__(self, name):
+        return getattr(get_memory(), name)
+
+# Global instance (created on first use)
+memory = _LazyMemory()
 
@@ -1,6 +1,13 @@
 """
 A1 Overlay Controller
-Communicates with the Tauri overlay via a simple HTTP server.
+Communicates with the Tauri overlay via a small threaded HTTP server.
+
+- GET  /        current state as JSON (one-off snapshot)
+- GET  /events  Server-Sent Events: pushed only when state or captions change
+- POST /        typed input from the overlay (see core/text_input.py)
+
+Every change bumps a monotonically increasing version; clients drop anything
+not newer than what they have. `session` changes when A1 restarts.
 
 States:
 - idle: Purple orb, gentle pulse
@@ -12,39 +19,98 @@ States:
 
 import subprocess
 import os
+import sys
 import time
 import threading
+import json
 import http.server
-import socketserver
 from pathlib import Path
 from colorama import Fore, Style
 
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from core import text_input
+
 # Path to the overlay binary
 BASE_DIR = Path(__file__).parent.parent
 OVERLAY_BINARY = BASE_DIR / "gui-overlay" / "target" / "release" / "a1-overlay"
 
 # HTTP Server for state communication
 STATE_PORT = 9877
+SSE_KEEPALIVE = 30.0  # Seconds between comment lines on an idle stream (detects dead clients)
+SSE_RETRY_MS = 1000   # Client reconnect delay after the stream drops
+
 current_data = {
     "state": "idle",
     "user_text": "",
     "ai_text": ""
 }
+_version = 0
+_session = int(time.time() * 1000)
+_changed = threading.Condition()
+_closing = False
+
+def _publish(**changes):
+    """Applies changes to current_data and wakes the event streams if anything changed."""
+    global _version
+    with _changed:
+        if all(current_data.get(k) == v for k, v in changes.items()):
+            return
+        current_data.update(changes)
+        _version += 1
+        _changed.notify_all()
+
+def snapshot():
+    """Current state, captions and version as one dict."""
+    with _changed:
+        return dict(current_data, version=_version, session=_session)
 
 class StateHandler(http.server.BaseHTTPRequestHandler):
-    """Simple HTTP handler that returns the current overlay state as JSON"""
+    """Serves the overlay state (snapshot or event stream) and accepts typed input"""
     
     def log_message(self, format, *args):
         pass  # Suppress logging
     
     def do_GET(self):
-        global current_data
-        import json
+        if self.path.split("?")[0] == "/events":
+            return self._stream_events()
         self.send_response(200)
         self.send_header('Content-type', 'application/json')
         self.send_header('Access-Control-Allow-Origin', '*')  # CORS
         self.end_headers()
-        self.wfile.write(json.dumps(current_data).encode())
+        self.wfile.write(json.dumps(snapshot()).encode())
+
+    def _stream_events(self):
+        """Holds the connection open and writes one event per state version."""
+        self.send_response(200)
+        self.send_header('Content-type', 'text/event-stream')
+        self.send_header('Cache-Control', 'no-cache')
+        self.send_header('Access-Control-Allow-Origin', '*')
+        self.end_headers()
+
+        # A reconnecting EventSource sends the last id it saw: "<session>:<version>"
+        sent = None
+        last_id = self.headers.get('Last-Event-ID', '')
+        if last_id == f"{_session}:{_version}":
+            sent = _version
+
+        try:
+            self.wfile.write(f"retry: {SSE_RETRY_MS}\n\n".encode())
+            self.wfile.flush()
+            while not _closing:
+                with _changed:
+                    if sent == _version:
+                        _changed.wait(SSE_KEEPALIVE)
+                    data = dict(current_data, version=_version, session=_session)
+                if _closing:
+                    break
+                if data["version"] == sent:
+                    self.wfile.write(b": keepalive\n\n")
+                else:
+                    self.wfile.write(f"id: {_session}:{data['version']}\ndata: {json.dumps(data)}\n\n".encode())
+                    sent = data["version"]
+                self.wfile.flush()
+        except (BrokenPipeError, ConnectionResetError):
+            pass  # Overlay closed or reloaded
     
     def do_POST(self):
         """Handle incoming text input from GUI"""
@@ -52,10 +118,8 @@ class StateHandler(http.server.BaseHTTPRequestHandler):
             content_length = int(self.headers['Content-Length'])
             post_data = self.rfile.read(content_length).decode('utf-8')
             
-            # Here we need to inject this text into the main loop.
-            # Writing to a temporary file or using a shared queue is easiest for now.
-            with open("gui_input.txt", "w") as f:
-                f.write(post_data)
+            # Hand the text to the main loop (processed in arrival order)
+            text_input.submit(post_data)
                 
             self.send_response(200)
             self.end_headers()
@@ -84,8 +148,12 @@ class OverlayController:
     
     def _start_state_server(self):
         """Start the HTTP server for state communication"""
+        global _closing
+        _closing = False
         try:
-            self.server = socketserver.TCPServer(("127.0.0.1", STATE_PORT), StateHandler)
+            # One thread per connection: event streams stay open while snapshots/POSTs are served
+            self.server = http.server.ThreadingHTTPServer(("127.0.0.1", STATE_PORT), StateHandler)
+            self.server.daemon_threads = True
             self.server_thread = threading.Thread(target=self.server.serve_forever, daemon=True)
             self.server_thread.start()
             print(f"{Fore.GREEN}[OVERLAY] State server running on port {STATE_PORT}{Style.RESET_ALL}")
@@ -126,8 +194,14 @@ class OverlayController:
     
     def stop(self):
         """Stop the overlay application"""
+        global _closing
         if self.server:
+            with _changed:
+                _closing = True  # Ends open event streams
+                _changed.notify_all()
             self.server.shutdown()
+            self.server.server_close()
+            self.server = None
         if self.process:
             try:
                 self.process.terminate()
@@ -143,16 +217,17 @@ class OverlayController:
         Set the overlay visual state.
         States: idle, listening, thinking, speaking, error
         """
-        global current_data
-        current_data["state"] = state
+        _publish(state=state)
     
     def update_captions(self, user_text=None, ai_text=None):
         """Updates the caption text."""
-        global current_data
+        changes = {}
         if user_text is not None:
-            current_data["user_text"] = user_text
+            changes["user_text"] = user_text
         if ai_text is not None:
-            current_data["ai_text"] = ai_text
+            changes["ai_text"] = ai_text
+        if changes:
+            _publish(**changes)
     
     def idle(self):
         self.set_state("idle")
@@ -0,0 +1,213 @@
+"""
+A1 Speaker Profile Store
+Persists speaker embeddings (user_profile.npy) off the response path.
+
+- ProfileWriter coalesces adaptive updates in memory and writes the newest one
+  from a background thread every FLUSH_SECONDS or after FLUSH_UPDATES updates,
+  and once more on shutdown (close_all()).
+- Every write goes to a temp file in the same directory, is fsync'ed and then
+  renamed over the profile, so a crash never leaves a half-written .npy.
+- A version counter in a sidecar file (user_profile.meta.json) is bumped on
+  every write. The assistant only writes if the version on disk is still the
+  one it loaded; if voice_enroll.py saved a new profile meanwhile, the pending
+  adaptation is dropped and the new profile is picked up instead.
+  The sidecar also carries per-speaker "settings" (see core/speaker_registry.py),
+  which later writes keep.
+"""
+
+import os
+import json
+import time
+import tempfile
+import threading
+import numpy as np
+from colorama import Fore, Style
+
+try:
+    import fcntl
+except ImportError:  # Not on POSIX: writes are still atomic, just not serialized across processes
+    fcntl = None
+
+FLUSH_SECONDS = 30.0
+FLUSH_UPDATES = 10
+
+def meta_path(path):
+    return os.path.splitext(path)[0] + ".meta.json"
+
+def read_meta(path):
+    """Sidecar contents ({} if the profile has never been versioned)."""
+    try:
+        with open(meta_path(path), 'r') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def read_version(path):
+    """Version of the profile on disk (0 if it has never been versioned)."""
+    try:
+        return int(read_meta(path).get("version", 0))
+    except (TypeError, ValueError):
+        return 0
+
+class _FileLock:
+    """Exclusive lock on <profile>.lock so two processes never write at once."""
+    def __init__(self, path):
+        self.path = path + ".lock"
+        self.fd = None
+
+    def __enter__(self):
+        if fcntl is not None:
+            self.fd = os.open(self.path, os.O_CREAT | os.O_RDWR, 0o644)
+            fcntl.flock(self.fd, fcntl.LOCK_EX)
+        return self
+
+    def __exit__(self, *exc):
+        if self.fd is not None:
+            fcntl.flock(self.fd, fcntl.LOCK_UN)
+            os.close(self.fd)
+            self.fd = None
+
+def _atomic_write(path, write):
+    """Calls write(file) on a temp file next to `path`, then renames it into place."""
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp = tempfile.mkstemp(dir=directory, prefix=".tmp-", suffix=os.path.basename(path))
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            write(f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            os.unlink(tmp)
+        except OSError:
+            pass
+        raise
+
+def save_profile(path, embedding, expected_version=None, writer="assistant", settings=None):
+    """
+    Atomically writes the embedding and bumps the version.
+    expected_version: only write if the disk version still equals it.
+    settings: merged into the stored per-profile settings.
+    Returns the new version, or None if another writer got there first.
+    """
+    with _FileLock(path):
+        old = read_meta(path)
+        current = read_version(path)
+        if expected_version is not None and current != expected_version:
+            return None
+        version = current + 1
+        _atomic_write(path, lambda f: np.save(f, np.asarray(embedding, dtype=np.float32)))
+        meta = {"version": version, "saved_at": time.time(), "writer": writer,
+                "settings": {**old.get("settings", {}), **(settings or {})}}
+        _atomic_write(meta_path(path), lambda f: f.write(json.dumps(meta).encode()))
+    return version
+
+def load_profile(path):
+    """Returns (embedding, version); embedding is None if there is no profile."""
+    with _FileLock(path):
+        if not os.path.exists(path):
+            return None, read_version(path)
+        return np.load(path), read_version(path)
+
+class ProfileWriter:
+    def __init__(self, path, flush_seconds=FLUSH_SECONDS, flush_updates=FLUSH_UPDATES, on_conflict=None):
+        """
+        on_conflict(embedding, version): called from the writer thread when the
+        profile was replaced by someone else (e.g. re-enrollment); the caller
+        should switch to it.
+        """
+        self.path = path
+        self.flush_seconds = flush_seconds
+        self.flush_updates = flush_updates
+        self.on_conflict = on_conflict
+        self.version = read_version(path)  # Version our in-memory profile is based on
+        self._pending = None
+        self._updates = 0
+        self._closed = False
+        self._cond = threading.Condition()
+        self.stats = {"updates": 0, "writes": 0, "conflicts": 0, "errors": 0}
+        self._thread = threading.Thread(target=self._run, daemon=True, name="profile-writer")
+        self._thread.start()
+        _writers.append(self)
+
+    def load(self):
+        """Loads the profile from disk and adopts its version. Returns the embedding (or None)."""
+        embedding, self.version = load_profile(self.path)
+        return embedding
+
+    def submit(self, embedding):
+        """Queues the latest profile; only the newest pending one is ever written."""
+        with self._cond:
+            self._pending = np.array(embedding, dtype=np.float32, copy=True)
+            self._updates += 1
+            self.stats["updates"] += 1
+            if self._updates >= self.flush_updates:
+                self._cond.notify_all()
+
+    def _run(self):
+        while True:
+            with self._cond:
+                self._cond.wait_for(lambda: self._closed or self._updates >= self.flush_updates,
+                                    timeout=self.flush_seconds)
+                closed = self._closed
+            self.flush()
+            if closed:
+                return
+
+    def flush(self):
+        """Writes the pending profile now. With nothing pending, picks up a profile saved elsewhere."""
+        with self._cond:
+            embedding, self._pending = self._pending, None
+            self._updates = 0
+        if embedding is None:
+            if read_version(self.path) != self.version:
+                self._adopt_disk()
+            return
+        try:
+            version = save_profile(self.path, embedding, expected_version=self.version)
+        except Exception as e:
+            self.stats["errors"] += 1
+            print(f"{Fore.RED}[PROFILE] Save failed: {e}{Style.RESET_ALL}")
+            return
+        if version is not None:
+            self.version = version
+            self.stats["writes"] += 1
+            return
+
+        # Someone (voice_enroll.py) saved a newer profile: theirs wins
+        self.stats["conflicts"] += 1
+        print(f"{Fore.YELLOW}[PROFILE] Profile changed on disk; dropping local adaptation.{Style.RESET_ALL}")
+        self._adopt_disk()
+
+    def _adopt_disk(self):
+        try:
+            fresh, self.version = load_profile(self.path)
+        except Exception as e:
+            print(f"{Fore.RED}[PROFILE] Reload failed: {e}{Style.RESET_ALL}")
+            return
+        if self.on_conflict is not None and fresh is not None:
+            self.on_conflict(fresh, self.version)
+
+    def close(self):
+        """Flushes pending changes and stops the writer thread."""
+        with self._cond:
+            if self._closed:
+                return
+            self._closed = True
+            self._cond.notify_all()
+        self._thread.join()
+        if self in _writers:
+            _writers.remove(self)
+
+    def get_stats(self):
+        s = dict(self.stats)
+        s["version"] = self.version
+        return s
+
+_writers = []
+
+def close_all():
+    """Flushes every open writer (call on shutdown)."""
+    for writer in list(_writers):
+        writer.close()
@@ -3,30 +3,36 @@ import os
 import sys
 import time
 import queue
+import threading
 import sounddevice as sd
 import vosk
 import json
-import torch
-import torchaudio
+import importlib.util
 import numpy as np
 from colorama import Fore, Style
 import re
 import soundfile as sf
 
-# Try to import TTS (XTTS v2)
-try:
-    from TTS.api import TTS
-    XTTS_AVAILABLE = True
-except ImportError:
-    XTTS_AVAILABLE = False
+# Import core modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from core import tts_cache, capture
+
+# XTTS v2 (Coqui TTS) and Piper are only located here; torch/TTS/onnxruntime
+# are imported when a model is actually loaded, not when this module is.
+XTTS_AVAILABLE = importlib.util.find_spec("TTS") is not None
+if not XTTS_AVAILABLE:
     print(f"{Fore.YELLOW}[WARNING] Coqui TTS not installed. XTTS v2 disabled.{Style.RESET_ALL}")
 
+# Piper as a library (persistent in-process voices)
+PIPER_LIB_AVAILABLE = importlib.util.find_spec("piper") is not None
+
 # --- CONFIGURATION ---
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 PIPER_BIN = os.path.join(BASE_DIR, "piper", "piper")
 MODELS_DIR = os.path.join(BASE_DIR, "models")
 SPEAKER_WAV = os.path.join(MODELS_DIR, "speaker.wav")
-TEMP_AUDIO_PATH = os.path.join(MODELS_DIR, "temp_output.wav")
+SPEAKER_LATENTS_PATH = os.path.join(MODELS_DIR, "speaker_latents.pt")
+XTTS_STREAMING = False  # Play XTTS audio chunk by chunk while inference is still running
 
 # Multi-Voice Configuration
 VOICES = {
@@ -36,6 +42,14 @@ VOICES = {
 
 # Global XTTS Model Holder
 xtts_model = None
+xtts_device = "cpu"
+speaker_latents = None  # (fingerprint, gpt_cond_latent, speaker_embedding)
+_xtts_lock = threading.Lock()  # One inference at a time (speak + cache pre-warm)
+_xtts_load_lock = threading.Lock()
+cached_phrases = set()  # Fixed phrases speak() plays from the TTS cache (see prewarm)
+
+# Words that cut playback short
+TRIGGER_WORDS = ["stop", "cancel", "wait", "change", "hey"]
 
 def detect_language(text):
     """
@@ -47,25 +61,256 @@ def detect_language(text):
     return "en"
 
 def load_xtts():
-    global xtts_model
     if not XTTS_AVAILABLE:
         return None
         
-    if xtts_model is None:
-        print(f"{Fore.CYAN}[XTTS] Loading Neural Model (v2)... This may take a moment.{Style.RESET_ALL}")
+    # Guarded so the cache pre-warm thread and speak() never load it twice
+    with _xtts_load_lock:
+        if xtts_model is None:
+            _load_xtts_model()
+    return xtts_model
+
+def _load_xtts_model():
+    global xtts_model, xtts_device
+    print(f"{Fore.CYAN}[XTTS] Loading Neural Model (v2)... This may take a moment.{Style.RESET_ALL}")
+    try:
+        import torch
+        from TTS.api import TTS
+        device = "cuda" if torch.cuda.is_available() else "cpu"
+        # Using the official XTTS v2 model
+        xtts_model = TTS("tts_models/multilingual/multi-dataset/xtts_v2").to(device)
+        xtts_device = device
+        print(f"{Fore.GREEN}[XTTS] Model Online ({device.upper()}).{Style.RESET_ALL}")
+    except Exception as e:
+        print(f"{Fore.RED}[XTTS ERROR] Failed to load model: {e}{Style.RESET_ALL}")
+        xtts_model = None
+        return
+
+    # Compute (or load) the speaker conditioning once, not per utterance
+    if os.path.exists(SPEAKER_WAV):
         try:
-            device = "cuda" if torch.cuda.is_available() else "cpu"
-            # Using the official XTTS v2 model
-            xtts_model = TTS("tts_models/multilingual/multi-dataset/xtts_v2").to(device)
-            print(f"{Fore.GREEN}[XTTS] Model Online ({device.upper()}).{Style.RESET_ALL}")
+            with _xtts_lock:
+                get_speaker_latents(xtts_model.synthesizer.tts_model)
         except Exception as e:
-            print(f"{Fore.RED}[XTTS ERROR] Failed to load model: {e}{Style.RESET_ALL}")
-            xtts_model = None
-    return xtts_model
+            print(f"{Fore.RED}[XTTS ERROR] Speaker conditioning failed: {e}{Style.RESET_ALL}")
+
+def _speaker_fingerprint():
+    st = os.stat(SPEAKER_WAV)
+    return f"{st.st_mtime_ns}:{st.st_size}"
+
+def get_speaker_latents(xtts):
+    """
+    Returns (gpt_cond_latent, speaker_embedding) for speaker.wav.
+    Memory first, then models/speaker_latents.pt, else computed and saved.
+    Both tiers are invalidated when speaker.wav changes.
+    """
+    import torch
+    global speaker_latents
+    fingerprint = _speaker_fingerprint()
+    if speaker_latents and speaker_latents[0] == fingerprint:
+        return speaker_latents[1], speaker_latents[2]
+
+    if os.path.exists(SPEAKER_LATENTS_PATH):
+        try:
+            saved = torch.load(SPEAKER_LATENTS_PATH, map_location=xtts_device)
+            if saved.get("fingerprint") == fingerprint:
+                speaker_latents = (fingerprint, saved["gpt_cond_latent"], saved["speaker_embedding"])
+                print(f"{Fore.BLUE}[XTTS] Speaker conditioning loaded from cache.{Style.RESET_ALL}")
+                return speaker_latents[1], speaker_latents[2]
+        except Exception as e:
+            print(f"{Fore.YELLOW}[XTTS] Ignoring unreadable latent cache: {e}{Style.RESET_ALL}")
+
+    start = time.time()
+    gpt_cond_latent, speaker_embedding = xtts.get_conditioning_latents(audio_path=[SPEAKER_WAV])
+    speaker_latents = (fingerprint, gpt_cond_latent, speaker_embedding)
+    print(f"{Fore.BLUE}[XTTS] Speaker conditioning computed in {time.time()-start:.2f}s.{Style.RESET_ALL}")
+
+    try:
+        tmp = SPEAKER_LATENTS_PATH + ".tmp"
+        torch.save({
+            "fingerprint": fingerprint,
+            "gpt_cond_latent": gpt_cond_latent.cpu(),
+            "speaker_embedding": speaker_embedding.cpu(),
+        }, tmp)
+        os.replace(tmp, SPEAKER_LATENTS_PATH)
+    except Exception as e:
+        print(f"{Fore.YELLOW}[XTTS] Could not save latent cache: {e}{Style.RESET_ALL}")
+    return gpt_cond_latent, speaker_embedding
+
+def _xtts_sample_rate(xtts):
+    try:
+        return xtts.config.audio.output_sample_rate
+    except AttributeError:
+        return 24000
+
+def watch_for_interrupt(vosk_model, is_active, stop, poll=0.05):
+    """
+    Listens for a trigger word while is_active() is true.
+    On a hit, calls stop() and returns the heard text; otherwise None.
+    """
+    rec = vosk.KaldiRecognizer(vosk_model, 16000)
+
+    # Shares the already-open mic with the wake word / ASR (no device open per utterance)
+    with capture.subscribe("barge-in") as sub:
+        while is_active():
+            data = sub.read(timeout=poll)
+            if data is None:
+                continue
+            if rec.AcceptWaveform(data.tobytes()):
+                res = json.loads(rec.Result())
+                t = res.get("text", "")
+                if any(w in t for w in TRIGGER_WORDS):
+                    print(f"{Fore.YELLOW}[INTERRUPT] Heard: '{t}'{Style.RESET_ALL}")
+                    stop()
+                    return t
+    return None
+
+# --- PIPER WORKERS ---
+class PlaybackJob:
+    """One queued utterance. done is set once its audio has finished (or was cancelled)."""
+    def __init__(self, text, speed, on_start=None):
+        self.text = text
+        self.speed = speed
+        self.on_start = on_start
+        self.cancelled = False
+        self.done = threading.Event()
+
+    def cancel(self):
+        self.cancelled = True
+
+class PiperWorker:
+    """
+    Long-running Piper synthesis thread for one voice.
+    The ONNX model is loaded once; text arrives over a queue and raw PCM
+    is streamed straight into an in-process output stream.
+    """
+    def __init__(self, model_path):
+        self.model_path = model_path
+        from piper.voice import PiperVoice
+        start = time.time()
+        self.voice = PiperVoice.load(model_path)
+        self.sample_rate = self.voice.config.sample_rate
+        self.stream = sd.RawOutputStream(samplerate=self.sample_rate, channels=1, dtype='int16')
+        self._voice_lock = threading.Lock()
+        self.jobs = queue.Queue()
+        self.thread = threading.Thread(target=self._run, daemon=True,
+                                       name=f"piper-{os.path.basename(model_path)}")
+        self.thread.start()
+        print(f"{Fore.GREEN}[PIPER] Voice '{os.path.basename(model_path)}' loaded in {time.time()-start:.2f}s.{Style.RESET_ALL}")
+
+    def say(self, text, speed=1.0, on_start=None):
+        """Queues text for playback. Returns the PlaybackJob."""
+        job = PlaybackJob(text, speed, on_start)
+        self.jobs.put(job)
+        return job
+
+    def synthesize(self, text, speed=1.0):
+        """Renders text to an int16 numpy buffer without playing it."""
+        with self._voice_lock:
+            audio = b"".join(self.voice.synthesize_stream_raw(
+                text, length_scale=speed, sentence_silence=0.2))
+        return np.frombuffer(audio, dtype=np.int16)
+
+    def _run(self):
+        while True:
+            job = self.jobs.get()
+            if job is None:
+                break
+            try:
+                if not job.cancelled:
+                    with self._voice_lock:
+                        self._play(job)
+            except Exception as e:
+                print(f"{Fore.RED}[PIPER ERROR] {e}{Style.RESET_ALL}")
+            finally:
+                job.done.set()
+
+    def _play(self, job):
+        self.stream.start()
+        started = False
+        # Piper yields one sentence at a time; write it in ~100 ms slices
+        # so a barge-in doesn't have to wait for the whole sentence.
+        slice_bytes = (self.sample_rate // 10) * 2
+        for audio_bytes in self.voice.synthesize_stream_raw(
+                job.text, length_scale=job.speed, sentence_silence=0.2):
+            if not started:
+                started = True
+                if job.on_start:
+                    job.on_start()
+            for i in range(0, len(audio_bytes), slice_bytes):
+                if job.cancelled:
+                    break
+                self.stream.write(audio_bytes[i:i + slice_bytes])
+            if job.cancelled:
+                break
+        if job.cancelled:
+            self.stream.abort()  # Drop queued audio immediately
+        else:
+            self.stream.stop()   # Let the buffer drain
 
-def play_audio_numpy(audio_data, sample_rate, vosk_model=None):
+    def close(self):
+        self.jobs.put(None)
+        self.thread.join(timeout=2)
+        self.stream.close()
+
+_piper_workers = {}
+_piper_lock = threading.Lock()
+
+def get_piper_worker(model_path):
+    """Returns the persistent worker for a voice, loading it on first use (None if unavailable)."""
+    if not PIPER_LIB_AVAILABLE or not os.path.exists(model_path):
+        return None
+    with _piper_lock:
+        if model_path not in _piper_workers:
+            try:
+                _piper_workers[model_path] = PiperWorker(model_path)
+            except Exception as e:
+                print(f"{Fore.RED}[PIPER ERROR] Failed to load {model_path}: {e}{Style.RESET_ALL}")
+                _piper_workers[model_path] = None
+        return _piper_workers[model_path]
+
+def load_piper_voices():
+    """Preloads one worker per configured voice."""
+    for model_path in VOICES.values():
+        get_piper_worker(model_path)
+
+def shutdown():
+    """Stops the Piper workers."""
+    with _piper_lock:
+        for worker in _piper_workers.values():
+            if worker:
+                worker.close()
+        _piper_workers.clear()
+
+def _chime(sample_rate=24000):
+    """Two short rising tones, used when an earcon file is missing."""
+    t = np.arange(int(0.07 * sample_rate)) / sample_rate
+    fade = np.minimum(1.0, np.minimum(t, t[::-1]) / 0.01)
+    tones = [0.25 * np.sin(2 * np.pi * f * t) * fade for f in (880, 1320)]
+    return np.concatenate(tones).astype(np.float32), sample_rate
+
+def play_earcon(path, block=False):
+    """
+    Plays a short sound file (e.g. sounds/startup.oga) without any TTS.
+    Returns its duration in seconds (0.0 if it couldn't be played).
+    """
+    try:
+        if os.path.exists(path):
+            data, samplerate = sf.read(path, dtype='float32')
+        else:
+            data, samplerate = _chime()
+        sd.play(data, samplerate)
+        if block:
+            sd.wait()
+        return len(data) / samplerate
+    except Exception as e:
+        print(f"{Fore.YELLOW}[EARCON] Could not play {os.path.basename(path)}: {e}{Style.RESET_ALL}")
+        return 0.0
+
+def play_audio_numpy(audio_data, sample_rate, vosk_model=None, on_start=None):
     """
     Plays audio data (numpy array) and handles interruption.
+    on_start is called the moment playback begins.
     """
     if audio_data is None or len(audio_data) == 0:
         return None
@@ -74,6 +319,8 @@ def play_audio_numpy(audio_data, sample_rate, vosk_model=None):
     
     # Start playback
     sd.play(audio_data, sample_rate)
+    if on_start:
+        on_start()
     
     start_time = time.time()
     
@@ -83,42 +330,163 @@ def play_audio_numpy(audio_data, sample_rate, vosk_model=None):
         return None
 
     # Interruption Loop
-    q = queue.Queue()
-    def callback(indata, frames, time, status):
-        q.put(bytes(indata))
-
-    trigger_words = ["stop", "cancel", "wait", "change", "hey"]
-    rec = vosk.KaldiRecognizer(vosk_model, 16000)
-
     try:
-        with sd.RawInputStream(samplerate=16000, blocksize=4000, dtype='int16',
-                               channels=1, callback=callback):
-            
-            while (time.time() - start_time) < duration:
-                # Check for active playback
-                if not sd.get_stream().active:
-                    break
-                    
-                if not q.empty():
-                    data = q.get()
-                    if rec.AcceptWaveform(data):
-                        res = json.loads(rec.Result())
-                        t = res.get("text", "")
-                        if any(w in t for w in trigger_words):
-                            print(f"{Fore.YELLOW}[INTERRUPT] Heard: '{t}'{Style.RESET_ALL}")
-                            sd.stop()
-                            return t
-                time.sleep(0.05)
-                
+        return watch_for_interrupt(
+            vosk_model,
+            is_active=lambda: (time.time() - start_time) < duration and sd.get_stream().active,
+            stop=sd.stop
+        )
     except Exception as e:
         print(f"{Fore.RED}[PLAYBACK ERROR] {e}{Style.RESET_ALL}")
         sd.stop()
     
     return None
 
-def speak(text, vosk_model=None):
+def xtts_synthesize(text):
+    """
+    Renders English text with XTTS v2 and the cached speaker conditioning.
+    Returns (audio, sample_rate) straight from memory, or None.
+    """
+    model = load_xtts()
+    if not model:
+        return None
+    xtts = model.synthesizer.tts_model
+    with _xtts_lock:
+        gpt_cond_latent, speaker_embedding = get_speaker_latents(xtts)
+        # Split into sentences like tts_to_file did: one pass is limited to ~250 chars / 400 tokens
+        out = xtts.inference(text, "en", gpt_cond_latent, speaker_embedding, enable_text_splitting=True)
+    wav = out["wav"]
+    if hasattr(wav, "cpu"):  # torch tensor
+        wav = wav.squeeze().cpu().numpy()
+    return np.asarray(wav, dtype=np.float32), _xtts_sample_rate(xtts)
+
+def xtts_stream(text):
+    """
+    Streaming XTTS inference. Yields float32 audio chunks as they are produced.
+    """
+    model = load_xtts()
+    if not model:
+        return
+    xtts = model.synthesizer.tts_model
+    with _xtts_lock:
+        gpt_cond_latent, speaker_embedding = get_speaker_latents(xtts)
+        for chunk in xtts.inference_stream(text, "en", gpt_cond_latent, speaker_embedding,
+                                           enable_text_splitting=True):
+            yield chunk.squeeze().cpu().numpy().astype(np.float32)
+
+def play_chunks(chunks, sample_rate, vosk_model=None, on_start=None):
+    """
+    Plays audio chunks as they arrive (e.g. from xtts_stream) and handles interruption.
+    """
+    job = PlaybackJob(None, None, on_start)
+
+    def _run():
+        try:
+            with sd.OutputStream(samplerate=sample_rate, channels=1, dtype='float32') as stream:
+                for chunk in chunks:
+                    if job.cancelled:
+                        break
+                    if job.on_start:
+                        job.on_start()
+                        job.on_start = None
+                    stream.write(chunk.reshape(-1, 1))
+                if job.cancelled:
+                    stream.abort()
+        except Exception as e:
+            print(f"{Fore.RED}[PLAYBACK ERROR] {e}{Style.RESET_ALL}")
+        finally:
+            chunks.close()  # Releases the XTTS lock if we stopped early
+            job.done.set()
+
+    threading.Thread(target=_run, daemon=True).start()
+    if not vosk_model:
+        job.done.wait()
+        return None
+    try:
+        return watch_for_interrupt(vosk_model, is_active=lambda: not job.done.is_set(), stop=job.cancel)
+    except Exception as e:
+        print(f"{Fore.RED}[PLAYBACK ERROR] {e}{Style.RESET_ALL}")
+        job.cancel()
+        return None
+
+def _uses_xtts(lang):
+    return lang == "en" and XTTS_AVAILABLE and os.path.exists(SPEAKER_WAV)
+
+def _piper_speed(lang):
+    return "1.2" if lang == "ta" else "1.0"
+
+def _voice_params(lang):
+    """(voice_id, speed) a phrase would be rendered with - part of the cache key."""
+    if _uses_xtts(lang):
+        return f"xtts_v2:{_speaker_fingerprint()}", "1.0"
+    return f"piper:{os.path.basename(VOICES.get(lang, VOICES['en']))}", _piper_speed(lang)
+
+def synthesize(text, lang):
+    """
+    Renders text to a numpy buffer without playing it.
+    Returns (audio, sample_rate, voice_id, speed) or None if no in-process engine is available.
+    """
+    if _uses_xtts(lang):
+        try:
+            result = xtts_synthesize(text)
+            if result is not None:
+                return (*result, *_voice_params(lang))
+        except Exception as e:
+            print(f"{Fore.RED}[XTTS FAIL] {e}. Falling back to Piper.{Style.RESET_ALL}")
+
+    model_path = VOICES.get(lang, VOICES["en"])
+    worker = get_piper_worker(model_path)
+    if worker:
+        speed = _piper_speed(lang)
+        return worker.synthesize(text, float(speed)), worker.sample_rate, f"piper:{os.path.basename(model_path)}", speed
+    return None
+
+def cached_audio(text, lang):
+    """
+    Returns (audio, sample_rate) for a phrase from the TTS cache, synthesizing
+    and storing it on a miss. None if it can't be rendered in-process.
+    """
+    voice, speed = _voice_params(lang)
+    entry = tts_cache.get_cache().get(tts_cache.make_key(text, voice, lang, speed))
+    if entry is not None:
+        return entry
+
+    result = synthesize(text, lang)
+    if result is None or len(result[0]) == 0:
+        return None
+    audio, sample_rate, rendered_voice, rendered_speed = result
+    # Stored under the key looked up above so the next call hits. If XTTS fell back
+    # to Piper, that entry is kept in memory only and the disk copy goes under Piper's
+    # key, so a later run with XTTS working doesn't keep replaying the fallback voice.
+    fallback = (rendered_voice, rendered_speed) != (voice, speed)
+    cache = tts_cache.get_cache()
+    cache.put(tts_cache.make_key(text, voice, lang, speed), audio, sample_rate, persist=not fallback)
+    if fallback:
+        cache.put(tts_cache.make_key(text, rendered_voice, lang, rendered_speed), audio, sample_rate)
+    return audio, sample_rate
+
+def prewarm(phrases):
+    """
+    Makes sure every phrase is in the TTS cache (synthesizing the missing ones).
+    From then on speak() plays these phrases from the cache.
+    """
+    start = time.time()
+    cached_phrases.update(phrases)
+    for phrase in phrases:
+        try:
+            cached_audio(phrase, detect_language(phrase))
+        except Exception as e:
+            print(f"{Fore.RED}[TTS CACHE] Pre-warm failed for '{phrase}': {e}{Style.RESET_ALL}")
+    stats = tts_cache.get_cache().get_stats()
+    print(f"{Fore.GREEN}[TTS CACHE] {len(phrases)} phrases warm in {time.time()-start:.2f}s "
+          f"(disk hits {stats['disk_hits']}, synthesized {stats['misses']}).{Style.RESET_ALL}")
+
+def speak(text, vosk_model=None, on_start=None, cache=None):
     """
     Speaks text using XTTS v2 (English) or Piper (Tamil/Fallback).
+    on_start is called when audio output begins (for latency tracking).
+    cache: play from / store in the TTS cache. Default: only for pre-warmed
+    phrases; everything else takes the streaming paths.
     """
     if not text:
         return None
@@ -136,6 +504,14 @@ def speak(text, vosk_model=None):
     lang_name = "TAMIL" if lang == "ta" else "ENGLISH"
     print(f"{Fore.GREEN}[A1 ({lang_name})]: {text_clean}{Style.RESET_ALL}")
 
+    # --- CACHE: fixed phrases play straight from memory ---
+    if cache is None:
+        cache = text_clean in cached_phrases
+    if cache:
+        entry = cached_audio(text_clean, lang)
+        if entry is not None:
+            return play_audio_numpy(entry[0], entry[1], vosk_model, on_start)
+
     # --- STRATEGY: XTTS v2 for English ---
     if lang == "en" and XTTS_AVAILABLE:
         # Check for speaker reference
@@ -145,24 +521,16 @@ def speak(text, vosk_model=None):
             # For now, we fallback to Piper if no speaker wav
             pass 
         else:
-            model = load_xtts()
-            if model:
-                try:
-                    # Generate to file (XTTS works best this way compared to pure stream)
-                    # We can use tts_to_file
-                    model.tts_to_file(
-                        text=text_clean,
-                        file_path=TEMP_AUDIO_PATH,
-                        speaker_wav=SPEAKER_WAV,
-                        language="en"
-                    )
-                    
-                    # Load and play
-                    data, samplerate = sf.read(TEMP_AUDIO_PATH)
-                    return play_audio_numpy(data, samplerate, vosk_model)
-                    
-                except Exception as e:
-                    print(f"{Fore.RED}[XTTS FAIL] {e}. Falling back to Piper.{Style.RESET_ALL}")
+            try:
+                if XTTS_STREAMING and load_xtts():
+                    rate = _xtts_sample_rate(xtts_model.synthesizer.tts_model)
+                    return play_chunks(xtts_stream(text_clean), rate, vosk_model, on_start)
+                result = xtts_synthesize(text_clean)
+                if result is not None:
+                    data, samplerate = result
+                    return play_audio_numpy(data, samplerate, vosk_model, on_start)
+            except Exception as e:
+                print(f"{Fore.RED}[XTTS FAIL] {e}. Falling back to Piper.{Style.RESET_ALL}")
 
     # --- FALLBACK / TAMIL: Piper TTS ---
     # (Original Logic Modified)
@@ -175,12 +543,28 @@ def speak(text, vosk_model=None):
              print(f"{Fore.RED}[TTS] No TTS engine available.{Style.RESET_ALL}")
              return None
 
-    # ... Piper Subprocess Logic ...
+    speed = _piper_speed(lang)
+
+    # ... Persistent Piper Worker (model stays loaded, no fork per utterance) ...
+    worker = get_piper_worker(model_path)
+    if worker:
+        job = worker.say(text_clean, float(speed), on_start)
+        if not vosk_model:
+            job.done.wait()
+            return None
+        try:
+            return watch_for_interrupt(vosk_model, is_active=lambda: not job.done.is_set(),
+                                       stop=job.cancel, poll=0.01)
+        except Exception as e:
+            print(f"{Fore.RED}[PIPER ERROR] {e}{Style.RESET_ALL}")
+            job.cancel()
+            return None
+
+    # ... Piper Subprocess Logic (fallback when piper-tts isn't installed) ...
     if not os.path.exists(PIPER_BIN) or not os.path.exists(model_path):
         return None
 
     aplay_cmd = ["aplay", "-r", "22050", "-f", "S16_LE", "-t", "raw", "-q"]
-    speed = "1.2" if lang == "ta" else "1.0"
     
     pipeline_cmd = [
         PIPER_BIN, 
@@ -197,6 +581,8 @@ def speak(text, vosk_model=None):
         
         p_aplay = subprocess.Popen(aplay_cmd, stdin=p_piper.stdout, stderr=subprocess.DEVNULL)
         if p_piper.stdout: p_piper.stdout.close()
+        if on_start:
+            on_start()
 
         # Monitor Piper Playback
         if not vosk_model:
@@ -204,33 +590,131 @@ def speak(text, vosk_model=None):
             return None
 
         # Interruption logic for Piper (Process based)
-        q = queue.Queue()
-        def callback(indata, frames, time, status):
-            q.put(bytes(indata))
-
-        trigger_words = ["stop", "cancel", "wait", "change", "hey"]
-        rec = vosk.KaldiRecognizer(vosk_model, 16000)
-
-        with sd.RawInputStream(samplerate=16000, blocksize=4000, dtype='int16',
-                               channels=1, callback=callback):
-            while p_aplay.poll() is None:
-                if not q.empty():
-                    data = q.get()
-                    if rec.AcceptWaveform(data):
-                        res = json.loads(rec.Result())
-                        t = res.get("text", "")
-                        if any(w in t for w in trigger_words):
-                            print(f"{Fore.YELLOW}[INTERRUPT] Heard: '{t}'{Style.RESET_ALL}")
-                            p_aplay.kill()
-                            p_piper.kill()
-                            return t
-                time.sleep(0.01)
+        def stop():
+            p_aplay.kill()
+            p_piper.kill()
+
+        return watch_for_interrupt(vosk_model, is_active=lambda: p_aplay.poll() is None,
+                                   stop=stop, poll=0.01)
 
     except Exception as e:
         print(f"{Fore.RED}[PIPER ERROR] {e}{Style.RESET_ALL}")
 
     return None
 
+# --- STREAMING (LLM tokens -> sentences -> TTS) ---
+SENTENCE_END = re.compile(r'(?<=[.!?;\u0964])\s+|\n+')
+TOOL_BLOCK = re.compile(r'\[\[.*?\]\]', re.DOTALL)
+MIN_SENTENCE_CHARS = 12  # Merge tiny fragments ("Sure.", "Okay.") into the next sentence
+# A period after these doesn't end the sentence ("Dr. Smith", "e.g. this")
+ABBREVIATIONS = {"dr.", "mr.", "mrs.", "ms.", "prof.", "st.", "jr.", "sr.", "vs.", "etc.",
+                 "e.g.", "i.e.", "approx.", "no.", "fig."}
+
+def _ends_with_abbreviation(text):
+    """True if text ends with an abbreviation or an initial ("J.") rather than a full stop."""
+    if not text.endswith("."):
+        return False
+    last = text.split()[-1].lower().lstrip("(\"'")
+    return last in ABBREVIATIONS or bool(re.fullmatch(r'[a-z]\.', last))
+
+class SentenceSegmenter:
+    """
+    Cuts a token stream into speakable sentences.
+    [[CALL:...]] tool blocks are never spoken.
+    """
+    def __init__(self):
+        self.buffer = ""
+
+    def feed(self, token):
+        """Adds a token; returns any sentences that are now complete."""
+        self.buffer = TOOL_BLOCK.sub("", self.buffer + token)
+
+        # Hold back an unfinished tool block (or a lone '[' that may start one)
+        cut = self.buffer.find("[[")
+        speakable = self.buffer if cut < 0 else self.buffer[:cut]
+        if speakable.endswith("["):
+            speakable = speakable[:-1]
+
+        sentences = []
+        pos = 0
+        for m in SENTENCE_END.finditer(speakable):
+            sentence = " ".join(speakable[pos:m.start()].split())
+            if "\n" not in m.group() and _ends_with_abbreviation(sentence):
+                continue
+            if len(sentence) >= MIN_SENTENCE_CHARS:
+                sentences.append(sentence)
+                pos = m.end()
+        self.buffer = self.buffer[pos:]
+        return sentences
+
+    def flush(self):
+        """Returns whatever is left once the stream ends."""
+        rest = TOOL_BLOCK.sub("", self.buffer)
+        cut = rest.find("[[")
+        if cut >= 0:
+            rest = rest[:cut]
+        self.buffer = ""
+        rest = " ".join(rest.split())
+        return [rest] if rest else []
+
+class StreamingSpeaker:
+    """
+    Speaks an LLM response sentence by sentence while it is still being generated.
+    Call feed() with each token, then finish() to wait for playback.
+    Reports time-to-first-token and time-to-first-audio per turn.
+    """
+    def __init__(self, vosk_model=None):
+        self.vosk_model = vosk_model
+        self.segmenter = SentenceSegmenter()
+        self.queue = queue.Queue()
+        self.interrupted = None
+        self.started = time.time()
+        self.first_token = None
+        self.first_audio = None
+        self.thread = threading.Thread(target=self._worker, daemon=True)
+        self.thread.start()
+
+    def _on_audio_start(self):
+        if self.first_audio is None:
+            self.first_audio = time.time() - self.started
+            try:
+                from core.overlay import get_overlay
+                get_overlay().speaking()
+            except:
+                pass
+
+    def _worker(self):
+        while True:
+            sentence = self.queue.get()
+            if sentence is None:
+                break
+            if self.interrupted:
+                continue  # Drain the rest after a barge-in
+            result = speak(sentence, self.vosk_model, on_start=self._on_audio_start)
+            if result:
+                self.interrupted = result
+
+    def feed(self, token):
+        if self.first_token is None:
+            self.first_token = time.time() - self.started
+        for sentence in self.segmenter.feed(token):
+            self.queue.put(sentence)
+
+    def finish(self):
+        """
+        Speaks the remaining text and blocks until playback ends.
+        Returns the interruption text if the user barged in.
+        """
+        for sentence in self.segmenter.flush():
+            self.queue.put(sentence)
+        self.queue.put(None)
+        self.thread.join()
+
+        ttft = f"{self.first_token:.2f}s" if self.first_token is not None else "n/a"
+        ttfa = f"{self.first_audio:.2f}s" if self.first_audio is not None else "n/a"
+        print(f"{Fore.CYAN}[LATENCY] First token: {ttft} | First audio: {ttfa} | Total: {time.time() - self.started:.2f}s{Style.RESET_ALL}")
+        return self.interrupted
+
 if __name__ == "__main__":
     # Test
     speak("System Check. XTTS capability enabled.")
@@ -65,6 +65,27 @@ class SpeakerEncoder:
             print(f"{Fore.RED}[SPEAKER ERROR] Extraction failed: {e}{Style.RESET_ALL}")
             return None
 
+    def embed_array(self, audio, sample_rate=16000):
+        """
+        Extract speaker embedding from audio already in memory
+        (int16 PCM or float32 in [-1, 1], mono). Returns: numpy array
+        """
+        try:
+            audio = np.asarray(audio)
+            if audio.dtype == np.int16:
+                audio = audio.astype(np.float32) / 32768.0
+            signal = torch.from_numpy(np.ascontiguousarray(audio, dtype=np.float32)).unsqueeze(0)
+
+            if sample_rate != 16000:
+                signal = torchaudio.functional.resample(signal, sample_rate, 16000)
+
+            embeddings = self.classifier.encode_batch(signal.to(self.device))
+            return embeddings.squeeze().cpu().detach().numpy()
+
+        except Exception as e:
+            print(f"{Fore.RED}[SPEAKER ERROR] Extraction failed: {e}{Style.RESET_ALL}")
+            return None
+
     def compute_similarity(self, embed1, embed2):
         """
         Compute Cosine Similarity between two embeddings.
@@ -0,0 +1,292 @@
+"""
+A1 Speaker Registry
+Several enrolled voices, identified with one matrix-vector product.
+
+Each speaker is its own profile file, written through core/profile_store.py,
+so enrolling or adapting one voice never touches the others:
+
+    primary speaker (voice_config "user_name") -> enrollment_file (user_profile.npy)
+    everyone else                              -> speakers/<name>.npy
+
+Per-speaker settings are stored in the profile's .meta.json ("settings"),
+falling back to voice_config.json:
+
+    prompt           Whisper initial prompt for this voice
+    adaptation_rate  how fast the profile follows the voice ("adaptation_rate")
+    language         language pin for the fast decode profile ("user_language")
+    threshold        similarity needed to accept this voice ("similarity_threshold")
+
+All embeddings are kept L2-normalized as rows of one contiguous float32
+matrix, so identification is `matrix @ embedding` and an argmax.
+
+Profiles enrolled or rewritten by other processes are picked up by refresh(),
+which only rescans once the profile files' mtimes change. A writable registry
+refreshes itself from a background thread every profile_flush_seconds, so
+identification never touches the filesystem.
+"""
+
+import os
+import re
+import sys
+import json
+import threading
+import numpy as np
+from colorama import Fore, Style
+
+# Import core modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from core import profile_store
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CONFIG_PATH = os.path.join(BASE_DIR, "voice_config.json")
+SETTING_KEYS = ("prompt", "adaptation_rate", "language", "threshold")
+
+def load_config():
+    if os.path.exists(CONFIG_PATH):
+        with open(CONFIG_PATH, 'r') as f:
+            return json.load(f)
+    return {}
+
+def slug(name):
+    return re.sub(r"[^\w-]+", "_", name.strip().lower()).strip("_") or "speaker"
+
+def normalize(embedding):
+    v = np.asarray(embedding, dtype=np.float32).ravel()
+    norm = np.linalg.norm(v)
+    return v / norm if norm > 0 else v
+
+class SpeakerRegistry:
+    def __init__(self, config=None, writable=True):
+        """
+        writable: adapt() persists profiles through background ProfileWriters
+        and a background thread calls refresh(). A read-only registry (wake
+        verification) calls refresh() itself to pick up changes.
+        """
+        config = load_config() if config is None else config
+        self.primary = config.get("user_name", "User")
+        self.primary_path = os.path.join(BASE_DIR, config.get("enrollment_file", "user_profile.npy"))
+        self.speakers_dir = os.path.join(BASE_DIR, config.get("speakers_dir", "speakers"))
+        self.defaults = {
+            "prompt": None,
+            "adaptation_rate": config.get("adaptation_rate", 0.05),
+            "language": config.get("user_language"),
+            "threshold": config.get("similarity_threshold", 0.25),
+        }
+        self.writable = writable
+        self.flush_seconds = config.get("profile_flush_seconds", profile_store.FLUSH_SECONDS)
+        self.flush_updates = config.get("profile_flush_updates", profile_store.FLUSH_UPDATES)
+
+        self.names = []
+        self.settings = []
+        self.matrix = np.zeros((0, 0), dtype=np.float32)
+        self._index = {}
+        self._paths = {}      # name -> profile file
+        self._writers = {}    # name -> ProfileWriter
+        self._signature = None
+        self._stamp = None
+        self._lock = threading.Lock()
+        self._load_lock = threading.Lock()  # load() runs on the caller and the refresh thread
+        self._closed = threading.Event()
+        self.load()
+        if writable:
+            threading.Thread(target=self._run, daemon=True, name="speaker-refresh").start()
+
+    def path_for(self, name):
+        if name in self._paths:
+            return self._paths[name]
+        if name == self.primary:
+            return self.primary_path
+        return os.path.join(self.speakers_dir, slug(name) + ".npy")
+
+    def _profile_paths(self):
+        """(name, path) of every profile on disk, primary first."""
+        found = []
+        if os.path.exists(self.primary_path):
+            found.append((self.primary, self.primary_path))
+        if os.path.isdir(self.speakers_dir):
+            for entry in sorted(os.listdir(self.speakers_dir)):
+                if entry.endswith(".npy"):
+                    path = os.path.join(self.speakers_dir, entry)
+                    name = profile_store.read_meta(path).get("settings", {}).get("name") or entry[:-4]
+                    if name != self.primary:
+                        found.append((name, path))
+        return found
+
+    def _disk_signature(self):
+        """
+        Which profiles exist (and, read-only, when they were written). A writable
+        registry sees rewrites of known profiles through its writers instead, so
+        its own flushes never trigger a reload.
+        """
+        paths = [path for _, path in self._profile_paths()]
+        if self.writable:
+            return tuple(paths)
+        sig = []
+        for path in paths:
+            try:
+                sig.append((path, os.stat(path).st_mtime_ns))
+            except OSError:
+                pass
+        return tuple(sig)
+
+    def _dir_stamp(self):
+        """
+        mtimes of the primary profile and the speakers directory. Every profile
+        write renames a file into place, so any add, remove or rewrite moves one of them.
+        """
+        stamp = []
+        for path in (self.primary_path, self.speakers_dir):
+            try:
+                stamp.append(os.stat(path).st_mtime_ns)
+            except OSError:
+                stamp.append(None)
+        return tuple(stamp)
+
+    def load(self):
+        """(Re)builds the matrix from every profile on disk."""
+        with self._load_lock:
+            return self._load()
+
+    def _load(self):
+        stamp = self._dir_stamp()  # Taken first: a write during the scan triggers another one
+        names, settings, rows, paths = [], [], [], {}
+        with self._lock:
+            known = {name: self.matrix[i].copy() for name, i in self._index.items()}
+        for name, path in self._profile_paths():
+            try:
+                if self.writable and name in known:
+                    # In-memory row is newest (adaptation may not be flushed yet);
+                    # re-enrollment of it arrives through the writer's on_conflict
+                    embedding = known[name]
+                elif self.writable:
+                    writer = self._writers.get(name)
+                    if writer is None:
+                        writer = profile_store.ProfileWriter(
+                            path, self.flush_seconds, self.flush_updates,
+                            on_conflict=lambda emb, version, name=name: self._replaced(name, emb))
+                        self._writers[name] = writer
+                    embedding = writer.load()
+                else:
+                    embedding, _ = profile_store.load_profile(path)
+            except Exception as e:
+                print(f"{Fore.RED}[SPEAKERS] Failed to load '{name}': {e}{Style.RESET_ALL}")
+                continue
+            if embedding is None:
+                continue
+            row = normalize(embedding)
+            if rows and len(row) != len(rows[0]):
+                print(f"{Fore.RED}[SPEAKERS] '{name}' has a {len(row)}-dim profile, expected {len(rows[0])}; skipped.{Style.RESET_ALL}")
+                continue
+            names.append(name)
+            paths[name] = path
+            settings.append(self._settings_for(path))
+            rows.append(row)
+
+        with self._lock:
+            self.names = names
+            self.settings = settings
+            self._index = {name: i for i, name in enumerate(names)}
+            self._paths = paths
+            self.matrix = np.ascontiguousarray(np.stack(rows)) if rows else np.zeros((0, 0), dtype=np.float32)
+            self._signature = self._disk_signature()
+            self._stamp = stamp
+        return names
+
+    def _settings_for(self, path):
+        stored = profile_store.read_meta(path).get("settings", {})
+        return {**self.defaults, **{k: v for k, v in stored.items() if k in SETTING_KEYS and v is not None}}
+
+    def refresh(self):
+        """Reloads if a profile was added, removed or rewritten on disk. Returns True if it did."""
+        stamp = self._dir_stamp()
+        if stamp == self._stamp:
+            return False  # Nothing written since the last scan: two stats, no listing
+        if self._disk_signature() == self._signature:
+            self._stamp = stamp
+            return False
+        self.load()
+        return True
+
+    def _run(self):
+        while not self._closed.wait(self.flush_seconds):
+            try:
+                self.refresh()
+            except Exception as e:
+                print(f"{Fore.RED}[SPEAKERS] Refresh failed: {e}{Style.RESET_ALL}")
+
+    def __len__(self):
+        return len(self.names)
+
+    def best_match(self, embedding):
+        """(name, similarity) of the closest enrolled voice, or (None, 0.0) if none."""
+        with self._lock:
+            if not self.names or embedding is None:
+                return None, 0.0
+            scores = self.matrix @ normalize(embedding)  # Cosine similarity to every speaker at once
+            i = int(np.argmax(scores))
+            return self.names[i], float(scores[i])
+
+    def identify(self, embedding):
+        """
+        Returns (name, similarity). name is None when the closest voice is below
+        its threshold; similarity is always that of the closest voice.
+        """
+        name, similarity = self.best_match(embedding)
+        if name is None or similarity < self.get(name)["threshold"]:
+            return None, similarity
+        return name, similarity
+
+    def get(self, name):
+        """Settings of a speaker (defaults for unknown names)."""
+        i = self._index.get(name)
+        return dict(self.settings[i]) if i is not None else dict(self.defaults)
+
+    def adapt(self, name, embedding):
+        """Mixes a new embedding into the speaker's row at its adaptation rate and queues the write."""
+        with self._lock:
+            i = self._index.get(name)
+            if i is None:
+                return
+            rate = self.settings[i]["adaptation_rate"]
+            row = normalize((1 - rate) * self.matrix[i] + rate * normalize(embedding))
+            self.matrix[i] = row
+        writer = self._writers.get(name)
+        if writer is not None:
+            writer.submit(row)
+
+    def _replaced(self, name, embedding):
+        """A profile was re-enrolled while running: use the new embedding and settings."""
+        settings = self._settings_for(self._paths.get(name, self.path_for(name)))
+        with self._lock:
+            i = self._index.get(name)
+            if i is None:
+                return
+            if len(embedding) != self.matrix.shape[1]:
+                print(f"{Fore.RED}[SPEAKERS] Re-enrolled '{name}' has a different dimension; restart to use it.{Style.RESET_ALL}")
+                return
+            self.matrix[i] = normalize(embedding)
+            self.settings[i] = settings
+        print(f"{Fore.BLUE}[SPEAKERS] Switched to re-enrolled profile for {name}.{Style.RESET_ALL}")
+
+    def enroll(self, name, embedding, writer="voice_enroll", **settings):
+        """
+        Adds or replaces one speaker's profile (other speakers are untouched).
+        settings: any of SETTING_KEYS; None values are left as they were.
+        Returns the new profile version.
+        """
+        path = self.path_for(name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        stored = {k: v for k, v in settings.items() if k in SETTING_KEYS and v is not None}
+        stored["name"] = name
+        version = profile_store.save_profile(path, normalize(embedding), writer=writer, settings=stored)
+        self.load()
+        return version
+
+    def close(self):
+        """Flushes pending adaptation for every speaker and stops refreshing."""
+        self._closed.set()
+        for writer in self._writers.values():
+            writer.close()
+
+    def get_stats(self):
+        return {"speakers": list(self.names), "dim": int(self.matrix.shape[1]) if len(self.names) else 0}
@@ -0,0 +1,120 @@
+"""
+A1 Startup Orchestrator
+Loads heavy components (Whisper, ECAPA, XTTS, memory, MCP...) in parallel
+worker threads so the wake word can start listening as soon as Vosk is up.
+
+Each component records when it started and became ready; report() prints
+the readiness timeline relative to process start.
+"""
+
+import threading
+import time
+from colorama import Fore, Style
+
+class Component:
+    def __init__(self, name, loader, after=()):
+        self.name = name
+        self.loader = loader
+        self.after = tuple(after)
+        self.result = None
+        self.error = None
+        self.started = None
+        self.finished = None
+        self.ready = threading.Event()
+
+    @property
+    def duration(self):
+        if self.started is None or self.finished is None:
+            return None
+        return self.finished - self.started
+
+class StartupOrchestrator:
+    def __init__(self, t0=None):
+        self.t0 = t0 if t0 is not None else time.time()
+        self.components = {}
+        self.marks = []
+        self._all_ready = threading.Event()
+
+    def add(self, name, loader, after=()):
+        """
+        Registers a component. loader() runs on its own thread once every
+        component named in `after` is ready; its return value is kept for get().
+        """
+        self.components[name] = Component(name, loader, after)
+
+    def mark(self, name):
+        """Records a milestone that isn't a background component (e.g. 'wake_ready')."""
+        now = time.time()
+        self.marks.append((name, now))
+        print(f"{Fore.GREEN}[BOOT] {name} at +{now - self.t0:.2f}s{Style.RESET_ALL}")
+
+    def start(self):
+        for component in self.components.values():
+            threading.Thread(target=self._run, args=(component,), daemon=True,
+                             name=f"boot-{component.name}").start()
+        threading.Thread(target=self._watch, daemon=True, name="boot-watch").start()
+
+    def _run(self, component):
+        for dep in component.after:
+            self.components[dep].ready.wait()
+        component.started = time.time()
+        try:
+            component.result = component.loader()
+        except Exception as e:
+            component.error = e
+            print(f"{Fore.RED}[BOOT] {component.name} failed: {e}{Style.RESET_ALL}")
+        finally:
+            component.finished = time.time()
+            component.ready.set()
+        if component.error is None:
+            print(f"{Fore.GREEN}[BOOT] {component.name} ready in {component.duration:.2f}s "
+                  f"(+{component.finished - self.t0:.2f}s){Style.RESET_ALL}")
+
+    def _watch(self):
+        for component in self.components.values():
+            component.ready.wait()
+        self._all_ready.set()
+        self.report()
+
+    def is_ready(self, name):
+        return self.components[name].ready.is_set()
+
+    def get(self, name, timeout=None):
+        """Waits for a component and returns what its loader returned."""
+        component = self.components[name]
+        if not component.ready.is_set():
+            print(f"{Fore.YELLOW}[BOOT] Waiting for {name}...{Style.RESET_ALL}")
+            if not component.ready.wait(timeout):
+                raise TimeoutError(f"{name} not ready after {timeout}s")
+        if component.error is not None:
+            raise RuntimeError(f"{name} failed to load: {component.error}") from component.error
+        return component.result
+
+    def peek(self, name):
+        """Result of a component if it's already loaded, else None (never waits)."""
+        component = self.components.get(name)
+        if component is None or not component.ready.is_set() or component.error is not None:
+            return None
+        return component.result
+
+    def wait_all(self, timeout=None):
+        return self._all_ready.wait(timeout)
+
+    def timeline(self):
+        """Milestones and components as (name, start, ready, status), seconds since t0."""
+        rows = [(name, None, at - self.t0, "mark") for name, at in self.marks]
+        for c in self.components.values():
+            rows.append((
+                c.name,
+                c.started - self.t0 if c.started is not None else None,
+                c.finished - self.t0 if c.finished is not None else None,
+                "failed" if c.error is not None else ("ready" if c.ready.is_set() else "loading"),
+            ))
+        return sorted(rows, key=lambda r: (r[2] is None, r[2] if r[2] is not None else 0))
+
+    def report(self):
+        print(f"{Fore.CYAN}[BOOT] Readiness timeline (seconds since process start):{Style.RESET_ALL}")
+        for name, start, ready, status in self.timeline():
+            start_s = f"{start:6.2f}" if start is not None else "     -"
+            ready_s = f"{ready:6.2f}" if ready is not None else "     -"
+            print(f"{Fore.CYAN}    {name:<12} start {start_s}  ready {ready_s}  {status}{Style.RESET_ALL}")
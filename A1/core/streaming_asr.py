@@ -0,0 +1,158 @@
+"""
+A1 Streaming Whisper
+Transcribes while the user is still talking so that, once endpointing fires,
+only the last second or two of speech still has to be decoded.
+
+Policy (LocalAgreement-2): every STEP_SECONDS of new audio, the uncommitted
+tail is decoded again. Words at the start of the tail that two consecutive
+decodes agree on are committed, and the tail is trimmed to just after the
+last committed word. The final decode therefore covers a short, roughly
+constant stretch instead of the whole utterance.
+
+Audio is read straight from the listener's capture.RecordingBuffer; call
+notify() after each append.
+"""
+
+import re
+import time
+import threading
+from colorama import Fore, Style
+
+STEP_SECONDS = 1.0        # New audio needed before the next interim decode
+MIN_TAIL_SECONDS = 1.0    # Interim decodes wait for at least this much uncommitted audio
+MIN_FINAL_SECONDS = 0.1   # A shorter final tail is not worth decoding
+KEEP_SILENCE_SECONDS = 0.3  # Trailing silence kept for the final decode (the rest is the endpoint wait)
+
+def _norm(word):
+    return re.sub(r"[^\w']", "", word.lower())
+
+class StreamingTranscriber:
+    def __init__(self, model, recording, offset=0, prompt="", step=STEP_SECONDS, options=None):
+        """
+        model: a core.asr_engine engine.
+        recording: the capture.RecordingBuffer being recorded into.
+        offset: sample in the recording to start decoding from.
+        options: extra decode options (e.g. language).
+        """
+        self.model = model
+        self.recording = recording
+        self.offset = offset
+        self.prompt = prompt
+        self.options = options or {}
+        self.sample_rate = recording.sample_rate
+        self.step = step
+
+        self.start = offset       # First sample not covered by committed words
+        self.committed = []       # (word, start_s, end_s), times within the recording
+        self.hypothesis = []      # Last interim decode of the tail, not yet agreed on
+        self._decoded_to = offset
+        self._closed = False
+        self._cond = threading.Condition()
+        self.stats = {"interim_decodes": 0, "interim_seconds": 0.0, "final_seconds": 0.0, "tail_seconds": 0.0}
+
+        self._worker = threading.Thread(target=self._run, daemon=True, name="asr-stream")
+        self._worker.start()
+
+    def notify(self):
+        """Wakes the decoder after the recording grew."""
+        with self._cond:
+            self._cond.notify_all()
+
+    def _run(self):
+        step = int(self.step * self.sample_rate)
+        while True:
+            with self._cond:
+                self._cond.wait_for(lambda: self._closed or self.recording.length - self._decoded_to >= step)
+                if self._closed:
+                    return
+                end = self.recording.length
+            try:
+                self._decode_interim(end)
+            except Exception as e:
+                print(f"{Fore.RED}[STREAM ASR] Interim decode failed: {e}{Style.RESET_ALL}")
+                self._decoded_to = end
+
+    def _transcribe(self, start, end):
+        """Decodes recording[start:end]; returns words with recording times."""
+        audio = self.recording.view(start, end)  # No copy
+        prompt = " ".join(p for p in (self.prompt, self.committed_text()) if p)
+        options = {"condition_on_previous_text": False, "temperature": 0.0}
+        options.update(self.options)
+        result = self.model.transcribe(audio, initial_prompt=prompt or None, word_timestamps=True, **options)
+        offset = start / self.sample_rate
+        words = []
+        for segment in result.get("segments", []):
+            for w in segment.get("words", []):
+                text = w["word"].strip()
+                if text:
+                    words.append((text, offset + w["start"], offset + w["end"]))
+        return words
+
+    def _decode_interim(self, end):
+        self._decoded_to = end
+        if end - self.start < MIN_TAIL_SECONDS * self.sample_rate:
+            return
+        t0 = time.time()
+        words = self._transcribe(self.start, end)
+        self.stats["interim_decodes"] += 1
+        self.stats["interim_seconds"] += time.time() - t0
+
+        # Commit the prefix this decode and the previous one agree on
+        agreed = 0
+        while (agreed < min(len(words), len(self.hypothesis))
+               and _norm(words[agreed][0]) == _norm(self.hypothesis[agreed][0])):
+            agreed += 1
+        if agreed:
+            self.committed.extend(words[:agreed])
+            self.start = min(end, int(words[agreed - 1][2] * self.sample_rate))
+        self.hypothesis = words[agreed:]
+
+    def committed_text(self):
+        return " ".join(w[0] for w in self.committed)
+
+    def partial_text(self):
+        """Committed words plus the latest unconfirmed hypothesis (for endpointing)."""
+        return " ".join(w[0] for w in self.committed + self.hypothesis)
+
+    def close(self):
+        """Stops the interim decoder without a final decode."""
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        self._worker.join()
+
+    def finish(self, prompt=None, trailing_silence=0.0, options=None, restart=False):
+        """
+        Stops interim decoding and decodes only the uncommitted tail.
+        prompt / options replace the initial prompt and decode options for that
+        tail (e.g. once the speaker is verified).
+        trailing_silence: seconds of silence the endpointer waited for; not decoded.
+        restart: drop the committed words and decode the whole utterance again
+        (they were decoded with a prompt / options that turned out to be wrong).
+        Returns the full transcript.
+        """
+        self.close()
+        if prompt is not None:
+            self.prompt = prompt
+        if options is not None:
+            self.options = options
+        if restart:
+            self.committed = []
+            self.hypothesis = []
+            self.start = self.offset
+        tail = []
+        drop = int(max(0.0, trailing_silence - KEEP_SILENCE_SECONDS) * self.sample_rate)
+        end = max(self.start, self.recording.length - drop)
+        tail_samples = end - self.start
+        self.stats["tail_seconds"] = tail_samples / self.sample_rate
+        if tail_samples >= MIN_FINAL_SECONDS * self.sample_rate:
+            t0 = time.time()
+            tail = self._transcribe(self.start, end)
+            self.stats["final_seconds"] = time.time() - t0
+        return " ".join(w[0] for w in self.committed + tail).strip()
+
+    def get_stats(self):
+        s = dict(self.stats)
+        s["committed_words"] = len(self.committed)
+        s["audio_seconds"] = (self.recording.length - self.offset) / self.sample_rate
+        return s
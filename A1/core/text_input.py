@@ -0,0 +1,39 @@
+"""
+A1 Typed Input Queue
+Text typed into the overlay (POSTed to the state server) is handed to the
+main loop through this thread-safe FIFO instead of a file on disk.
+
+The listening loops check it once per audio block (a length check, no
+syscall), so typed commands take over from wake-word listening within one
+block, and several inputs sent in a row are processed in order.
+"""
+
+import queue
+
+_inputs = queue.Queue()
+
+def submit(text):
+    """Queues typed text (called from the state server thread). Blank input is ignored."""
+    text = (text or "").strip()
+    if text:
+        _inputs.put(text)
+    return bool(text)
+
+def poll():
+    """Returns the oldest queued input, or None without blocking."""
+    if _inputs.empty():
+        return None
+    try:
+        return _inputs.get_nowait()
+    except queue.Empty:
+        return None
+
+def wait(timeout=None):
+    """Blocks for the next queued input; None on timeout."""
+    try:
+        return _inputs.get(timeout=timeout)
+    except queue.Empty:
+        return None
+
+def pending():
+    return _inputs.qsize()
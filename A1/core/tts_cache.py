@@ -0,0 +1,183 @@
+"""
+A1 TTS Audio Cache
+Content-addressed store of synthesized PCM for fixed and repeated phrases.
+
+Entries are keyed by (text, voice, language, speed) and live in two tiers:
+- memory: LRU bounded by total bytes
+- disk:   .npz files under models/tts_cache, bounded by total bytes (oldest-used evicted)
+
+Only fixed phrases go through it (see speak.speak(cache=...)); one-off replies
+are streamed. The shared instance is created on first use (get_cache()) and
+the directory on the first write, so importing this module touches no files.
+"""
+
+import os
+import hashlib
+import threading
+from collections import OrderedDict
+import numpy as np
+from colorama import Fore, Style
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CACHE_DIR = os.path.join(BASE_DIR, "models", "tts_cache")
+
+MAX_MEMORY_BYTES = 32 * 1024 * 1024
+MAX_DISK_BYTES = 256 * 1024 * 1024
+
+def make_key(text, voice, lang, speed):
+    raw = f"{voice}\x00{lang}\x00{speed}\x00{text}"
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+class AudioCache:
+    def __init__(self, cache_dir=CACHE_DIR, max_memory_bytes=MAX_MEMORY_BYTES, max_disk_bytes=MAX_DISK_BYTES):
+        self.cache_dir = cache_dir
+        self.max_memory_bytes = max_memory_bytes
+        self.max_disk_bytes = max_disk_bytes
+        self._memory = OrderedDict()  # key -> (audio, sample_rate)
+        self._memory_bytes = 0
+        self._disk_bytes = None  # Scanned on the first write, then kept up to date
+        self._lock = threading.Lock()
+        self.stats = {
+            "memory_hits": 0,
+            "disk_hits": 0,
+            "misses": 0,
+            "memory_evictions": 0,
+            "disk_evictions": 0,
+        }
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, f"{key}.npz")
+
+    def _remember(self, key, audio, sample_rate):
+        """Inserts into the memory tier and evicts least-recently-used entries."""
+        if key in self._memory:
+            self._memory.move_to_end(key)
+            return
+        self._memory[key] = (audio, sample_rate)
+        self._memory_bytes += audio.nbytes
+        while self._memory_bytes > self.max_memory_bytes and len(self._memory) > 1:
+            _, (old, _) = self._memory.popitem(last=False)
+            self._memory_bytes -= old.nbytes
+            self.stats["memory_evictions"] += 1
+
+    def get(self, key):
+        """Returns (audio, sample_rate) or None."""
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                self._memory.move_to_end(key)
+                self.stats["memory_hits"] += 1
+                return entry
+
+        path = self._path(key)
+        if os.path.exists(path):
+            try:
+                with np.load(path) as f:
+                    audio, sample_rate = f["audio"], int(f["sr"])
+                os.utime(path)  # Mark as recently used for disk eviction
+                with self._lock:
+                    self._remember(key, audio, sample_rate)
+                    self.stats["disk_hits"] += 1
+                return audio, sample_rate
+            except Exception as e:
+                print(f"{Fore.RED}[TTS CACHE] Dropping unreadable entry {key[:8]}: {e}{Style.RESET_ALL}")
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+
+        with self._lock:
+            self.stats["misses"] += 1
+        return None
+
+    def put(self, key, audio, sample_rate, persist=True):
+        """persist=False keeps the entry in memory only (e.g. audio from a fallback voice)."""
+        audio = np.ascontiguousarray(audio)
+        if audio.dtype == np.float64:
+            audio = audio.astype(np.float32)
+
+        with self._lock:
+            self._remember(key, audio, sample_rate)
+        if not persist:
+            return
+
+        # Write-then-rename so a crash never leaves a half-written entry
+        path = self._path(key)
+        tmp = path + ".tmp.npz"
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            np.savez(tmp, audio=audio, sr=sample_rate)
+            with self._lock:
+                if self._disk_bytes is None:
+                    self._disk_bytes = self._disk_usage()
+                old_size = os.path.getsize(path) if os.path.exists(path) else 0
+                os.replace(tmp, path)
+                self._disk_bytes += os.path.getsize(path) - old_size
+                if self._disk_bytes > self.max_disk_bytes:
+                    self._evict_disk()
+        except Exception as e:
+            print(f"{Fore.RED}[TTS CACHE] Write failed: {e}{Style.RESET_ALL}")
+
+    def __contains__(self, key):
+        with self._lock:
+            if key in self._memory:
+                return True
+        return os.path.exists(self._path(key))
+
+    def _entries(self):
+        """(mtime, size, name) of every finished entry on disk."""
+        entries = []
+        for name in os.listdir(self.cache_dir):
+            if not name.endswith(".npz") or name.endswith(".tmp.npz"):
+                continue
+            st = os.stat(os.path.join(self.cache_dir, name))
+            entries.append((st.st_mtime, st.st_size, name))
+        return entries
+
+    def _disk_usage(self):
+        try:
+            return sum(size for _, size, _ in self._entries())
+        except OSError:
+            return 0
+
+    def _evict_disk(self):
+        """
+        Called with the lock held, once the running total is over budget, so the
+        directory isn't listed on every put.
+        """
+        try:
+            entries = self._entries()
+        except OSError:
+            return
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, name in sorted(entries):
+            if total <= self.max_disk_bytes:
+                break
+            try:
+                os.remove(os.path.join(self.cache_dir, name))
+                total -= size
+                self.stats["disk_evictions"] += 1
+            except OSError:
+                pass
+        self._disk_bytes = total
+
+    def get_stats(self):
+        with self._lock:
+            s = dict(self.stats)
+            s["memory_entries"] = len(self._memory)
+            s["memory_bytes"] = self._memory_bytes
+        lookups = s["memory_hits"] + s["disk_hits"] + s["misses"]
+        s["hit_rate"] = (s["memory_hits"] + s["disk_hits"]) / lookups if lookups else 0.0
+        return s
+
+_cache = None
+_cache_lock = threading.Lock()
+
+def get_cache():
+    """The shared cache, created on first use."""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = AudioCache()
+    return _cache
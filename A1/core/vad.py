@@ -0,0 +1,196 @@
+"""
+A1 Voice Activity Gate
+Cheap energy-based front end that decides whether a block of audio is worth
+handing to a recognizer.
+
+The noise floor tracks the room: it follows quiet blocks down quickly and
+rises only slowly, so steady background noise (fans, hum) keeps the gate
+closed while speech opens it. A hangover keeps the gate open briefly after
+the energy drops so word endings aren't cut off.
+
+Endpointer uses the same floor tracking per block to decide when a spoken
+request is over. The silence it waits for grows with how long the user has
+been talking and with how unfinished the partial transcript looks, so
+"volume up" closes in a few hundred ms while dictation can pause.
+"""
+
+import re
+import numpy as np
+
+# Endpointing defaults (seconds)
+MIN_SILENCE = 0.3          # Silence that ends a very short command
+MAX_SILENCE = 2.0          # Never wait longer than this
+SILENCE_PER_SECOND = 0.1   # Extra silence allowed per second of speech so far
+MIN_SPEECH = 0.2           # Shorter bursts (clicks, breaths) don't start an utterance
+CALIBRATION_PERCENTILE = 20
+
+# Last words that mean the sentence isn't finished yet
+INCOMPLETE_ENDINGS = {
+    "and", "or", "but", "so", "then", "because", "if", "to", "the", "a", "an", "of",
+    "for", "with", "in", "on", "at", "from", "my", "your", "is", "are", "um", "uh",
+    "open", "play", "search", "set", "turn", "what", "how", "please",
+}
+
+def block_rms(block):
+    """RMS of an int16 block (float math, no int16 overflow)."""
+    x = block.astype(np.float32)
+    return float(np.sqrt(np.dot(x, x) / len(x))) if len(x) else 0.0
+
+def frame_rms(audio, frame_size, hop=None):
+    """
+    RMS of every frame of `audio` (hop defaults to frame_size), in one pass over
+    a strided window view instead of a Python loop over chunks.
+    """
+    x = np.asarray(audio, dtype=np.float32)
+    if len(x) < frame_size:
+        return np.zeros(0, dtype=np.float32)
+    frames = np.lib.stride_tricks.sliding_window_view(x, frame_size)[::hop or frame_size]
+    return np.sqrt(np.einsum("ij,ij->i", frames, frames) / frame_size)
+
+class EnergyGate:
+    def __init__(self, open_ratio=3.0, min_rms=60.0, hangover=0.8, block_seconds=0.1,
+                 floor_rise=0.02, floor_fall=0.3, initial_floor=100.0):
+        """
+        open_ratio:  speech must be this many times louder than the noise floor
+        min_rms:     absolute minimum level that can open the gate
+        hangover:    seconds the gate stays open after the last loud block
+        floor_rise / floor_fall: smoothing of the noise floor going up / down
+        """
+        self.open_ratio = open_ratio
+        self.min_rms = min_rms
+        self.hangover_blocks = max(1, int(round(hangover / block_seconds)))
+        self.floor_rise = floor_rise
+        self.floor_fall = floor_fall
+        self.noise_floor = initial_floor
+        self.level = 0.0
+        self.is_open = False
+        self._hang = 0
+        self.stats = {"blocks": 0, "open_blocks": 0, "openings": 0}
+
+    @property
+    def threshold(self):
+        return max(self.min_rms, self.noise_floor * self.open_ratio)
+
+    def update(self, block, level=None):
+        """Feeds one block (or its precomputed RMS as `level`); returns True while the gate is open."""
+        self.level = block_rms(block) if level is None else level
+        self.stats["blocks"] += 1
+
+        if self.level > self.threshold:
+            if not self.is_open:
+                self.stats["openings"] += 1
+            self.is_open = True
+            self._hang = self.hangover_blocks
+            # Creep up very slowly so a new, steady noise source can't hold the gate open forever
+            self.noise_floor += self.floor_rise * 0.1 * (self.level - self.noise_floor)
+        else:
+            rate = self.floor_fall if self.level < self.noise_floor else self.floor_rise
+            self.noise_floor += rate * (self.level - self.noise_floor)
+            if self._hang > 0:
+                self._hang -= 1
+            self.is_open = self._hang > 0
+
+        if self.is_open:
+            self.stats["open_blocks"] += 1
+        return self.is_open
+
+    def reset(self):
+        self.is_open = False
+        self._hang = 0
+
+    def get_stats(self):
+        s = dict(self.stats)
+        s["noise_floor"] = self.noise_floor
+        s["duty_cycle"] = s["open_blocks"] / s["blocks"] if s["blocks"] else 0.0
+        return s
+
+def transcript_complete(text):
+    """
+    True if a partial transcript reads like a finished request, False if it clearly
+    isn't (trailing "and", "to", comma...), None if there's nothing to judge.
+    """
+    text = (text or "").strip()
+    if not text:
+        return None
+    last = re.sub(r"[^\w']", "", text.split()[-1].lower())
+    if last in INCOMPLETE_ENDINGS or text.endswith((",", "...")):
+        return False
+    if text[-1] in ".?!":
+        return True
+    return None
+
+class Endpointer:
+    def __init__(self, block_seconds=0.1, min_silence=MIN_SILENCE, max_silence=MAX_SILENCE,
+                 silence_per_second=SILENCE_PER_SECOND, min_speech=MIN_SPEECH,
+                 open_ratio=3.0, min_rms=60.0, initial_floor=100.0):
+        self.block_seconds = block_seconds
+        self.min_silence = min_silence
+        self.max_silence = max_silence
+        self.silence_per_second = silence_per_second
+        self.min_speech = min_speech
+        # One-block hangover: every block is classified on its own
+        self.gate = EnergyGate(open_ratio=open_ratio, min_rms=min_rms, hangover=block_seconds,
+                               block_seconds=block_seconds, initial_floor=initial_floor)
+        self.speech_seconds = 0.0   # Speech heard since the request started
+        self.silence_seconds = 0.0  # Silence since the last speech block
+        self.lead_in_speech = False # Speech in the lead-in (e.g. the wake phrase)
+        self.partial = ""
+        self.in_speech = False
+
+    def calibrate(self, audio, block_size):
+        """Seeds the noise floor from int16 audio heard before the request (low percentile of block RMS)."""
+        levels = frame_rms(audio, block_size)
+        if len(levels):
+            self.gate.noise_floor = float(np.percentile(levels, CALIBRATION_PERCENTILE))
+
+    @property
+    def has_speech(self):
+        return self.speech_seconds >= self.min_speech
+
+    def timeout(self):
+        """Silence needed to end the utterance right now."""
+        if not self.has_speech:
+            return self.max_silence  # Only lead-in speech so far (e.g. "Hey A1" and a pause)
+        t = self.min_silence + self.silence_per_second * self.speech_seconds
+        complete = transcript_complete(self.partial)
+        if complete is False:
+            t = self.max_silence
+        elif complete is True:
+            t = max(self.min_silence, 0.5 * t)
+        return min(t, self.max_silence)
+
+    def prime(self, block, level=None):
+        """
+        Feeds lead-in audio (the wake phrase pre-roll): tracks the level and
+        noise floor, but its speech doesn't count towards the request.
+        """
+        self.in_speech = self.gate.update(block, level)
+        if self.in_speech:
+            self.lead_in_speech = True
+        return self.in_speech
+
+    def update(self, block, partial_text=None, level=None):
+        """Feeds one block (level: its RMS if already known). Returns True once the utterance is over."""
+        self.in_speech = self.gate.update(block, level)
+        if partial_text is not None:
+            self.partial = partial_text
+        if self.in_speech:
+            self.speech_seconds += self.block_seconds
+            self.silence_seconds = 0.0
+            return False
+        if self.speech_seconds == 0.0 and not self.lead_in_speech:
+            return False  # Still waiting for the user to start
+        self.silence_seconds += self.block_seconds
+        if not self.has_speech and not self.lead_in_speech and self.silence_seconds >= self.min_silence:
+            # A click or breath, not the start of a request
+            self.speech_seconds = self.silence_seconds = 0.0
+            return False
+        return self.silence_seconds >= self.timeout()
+
+    def get_stats(self):
+        return {
+            "speech_seconds": self.speech_seconds,
+            "silence_seconds": self.silence_seconds,
+            "timeout": self.timeout(),
+            "noise_floor": self.gate.noise_floor,
+        }
@@ -3,14 +3,15 @@ import os
 import time
 import sounddevice as sd
 import numpy as np
-import scipy.io.wavfile as wav
 import json
+import argparse
 from colorama import Fore, Style
 
 # Ensure we can import core modules
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from core.speaker_embed import SpeakerEncoder
+from core.speaker_registry import SpeakerRegistry
 
 CONFIG_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "voice_config.json")
 
@@ -26,14 +27,33 @@ def record_audio(duration=5, fs=16000):
     sd.wait()
     return recording
 
+def parse_args():
+    parser = argparse.ArgumentParser(description="Enroll (or re-enroll) a speaker for Adaptive ASR.")
+    parser.add_argument("--name", help="Speaker to add or update (default: user_name from voice_config.json)")
+    parser.add_argument("--prompt", help="Whisper initial prompt used when this speaker is identified")
+    parser.add_argument("--rate", type=float, help="Adaptation rate for this speaker's profile")
+    parser.add_argument("--language", help="Language pin for the fast decode profile (e.g. en, ta)")
+    parser.add_argument("--threshold", type=float, help="Similarity needed to accept this speaker")
+    parser.add_argument("--list", action="store_true", help="List enrolled speakers and exit")
+    return parser.parse_args()
+
 def main():
+    args = parse_args()
+    config = load_config()
+    registry = SpeakerRegistry(config, writable=False)
+    if args.list:
+        for name in registry.names:
+            print(f"{name}: {registry.get(name)}")
+        return
+
+    name = args.name or registry.primary
+    output_path = registry.path_for(name)
+
     print(f"{Fore.GREEN}=== A1 Voice Enrollment ==={Style.RESET_ALL}")
-    print("This script will create a speaker profile for Adaptive ASR.")
+    print(f"This script will create a speaker profile for Adaptive ASR: {name}")
     print("We will record multiple samples of your voice to build a robust profile.")
-    
-    config = load_config()
-    output_file = config.get("enrollment_file", "user_profile.npy")
-    output_path = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), output_file)
+    if name in registry.names:
+        print(f"{Fore.YELLOW}'{name}' is already enrolled; their profile will be replaced (others are kept).{Style.RESET_ALL}")
     
     # Initialize component
     try:
@@ -59,23 +79,15 @@ def main():
             duration = 10
             audio_data = record_audio(duration)
             
-            # Save temp wav
-            temp_wav = "temp_enroll.wav"
-            wav.write(temp_wav, 16000, audio_data)
-            
-            # Extract
+            # Extract (straight from memory, same path as AdaptiveEar)
             print("Extracting embedding...")
-            emb = encoder.embed_file(temp_wav)
+            emb = encoder.embed_array(audio_data.flatten(), 16000)
             
             if emb is not None:
                 embeddings.append(emb)
                 sample_count += 1
                 print(f"{Fore.GREEN}Sample {sample_count} captured.{Style.RESET_ALL}")
             
-            # Cleanup
-            if os.path.exists(temp_wav):
-                os.remove(temp_wav)
-                
             # Suggestion to continue
             if sample_count >= 5:
                 print(f"{Fore.BLUE}Good amount of data collected. You can stop now or continue for better accuracy.{Style.RESET_ALL}")
@@ -100,9 +112,10 @@ def main():
     if norm > 0:
         mean_emb = mean_emb / norm
         
-    # Save
-    np.save(output_path, mean_emb)
-    print(f"{Fore.GREEN}Success! Profile saved to: {output_path}{Style.RESET_ALL}")
+    # Save (atomic, only this speaker; a running assistant picks it up on its next turn/flush)
+    version = registry.enroll(name, mean_emb, prompt=args.prompt, adaptation_rate=args.rate,
+                              language=args.language, threshold=args.threshold)
+    print(f"{Fore.GREEN}Success! Profile v{version} for {name} saved to: {output_path}{Style.RESET_ALL}")
     print(f"Vector shape: {mean_emb.shape}")
 
 if __name__ == "__main__":
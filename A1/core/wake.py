@@ -1,13 +1,22 @@
 import json
+import re
 import vosk
-import sounddevice as sd
 import sys
 import os
+import time
+from collections import deque
 from colorama import Fore, Style
 
+# Import core modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from core import capture, vad, text_input
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CONFIG_PATH = os.path.join(BASE_DIR, "voice_config.json")
+
 # Tuning parameters
 SAMPLE_RATE = 16000
-BLOCK_SIZE = 8000
+PREROLL_SECONDS = 0.5  # Pre-roll before the detection when the phrase end isn't known
 WAKE_PHRASES = [
     "hey a1", "hey a one", "hey anyone", "hey everyone", "hey one", "hey on", 
     "a1", "a one", "ay one", "anyone", "everyone",
@@ -16,55 +25,370 @@ WAKE_PHRASES = [
 
 import numpy as np
 
-def listen_for_wake_word(model, input_device_index=None):
-    rec = vosk.KaldiRecognizer(model, SAMPLE_RATE)
+# Wake decoding mode (voice_config.json "wake_mode"):
+#   "free"    - full vocabulary, substring match against WAKE_PHRASES
+#   "grammar" - recognizer restricted to "wake_grammar" phrases + [unk]
+WAKE_MODE = "free"
+WAKE_GRAMMAR = ["hey a one", "a one", "ay one", "hey anyone", "hey everyone"]
+
+# Energy gate in front of Vosk (see core/vad.py)
+GATE_ENABLED = True
+GATE_LEAD_IN_BLOCKS = 3  # Quiet blocks before the gate opened, replayed to Vosk
+WAKE_SEGMENT_SECONDS = 1.2  # Audio ending at the detection handed to the wake verifier
+DECODE_HISTORY_BLOCKS = 100  # Decoded blocks remembered to map Vosk word times to capture blocks
+
+# Capture block in which the last wake word was detected, and the one in which
+# the wake phrase itself ended (from Vosk word times; None if unknown)
+last_wake_block = None
+last_wake_end_block = None
+
+# One detector per Vosk model, kept across wake loops so the gate's noise floor keeps adapting
+_detectors = {}
+
+def load_wake_config():
+    """Returns (mode, grammar phrases) from voice_config.json, falling back to the defaults."""
+    config = {}
+    if os.path.exists(CONFIG_PATH):
+        try:
+            with open(CONFIG_PATH, 'r') as f:
+                config = json.load(f)
+        except Exception as e:
+            print(f"{Fore.RED}[WAKE] Could not read {os.path.basename(CONFIG_PATH)}: {e}{Style.RESET_ALL}")
+    mode = config.get("wake_mode", WAKE_MODE)
+    grammar = [p.lower() for p in config.get("wake_grammar", WAKE_GRAMMAR)]
+    if mode not in ("free", "grammar"):
+        print(f"{Fore.YELLOW}[WAKE] Unknown wake_mode '{mode}', using 'free'.{Style.RESET_ALL}")
+        mode = "free"
+    return mode, grammar
+
+def preroll_start(seconds=PREROLL_SECONDS):
+    """
+    Capture block to start command recording from so speech that runs straight
+    on from "Hey A1 ..." isn't lost: the block in which the wake phrase ended,
+    or `seconds` before the detection if its end isn't known. None if no wake
+    word was detected yet.
+    """
+    if last_wake_block is None:
+        return None
+    if last_wake_end_block is not None:
+        return last_wake_end_block
+    return max(0, last_wake_block - capture.blocks_for(seconds))
+
+def strip_wake_phrase(text):
+    """
+    Removes what the pre-roll carried of the wake phrase from the start of the
+    transcript: a whole phrase ("hey a one, open firefox") or just its tail
+    ("one, open firefox").
+    """
+    if not text:
+        return text
+    words = text.split()
+    normalized = [re.sub(r"[^\w]", "", w.lower()) for w in words]
+    tails = {tuple(p.split()[i:]) for p in WAKE_PHRASES for i in range(len(p.split()))}
+    for n in range(min(len(words), max(map(len, tails))), 0, -1):
+        if tuple(normalized[:n]) in tails:
+            return " ".join(words[n:]).strip(" ,.!?-")
+    return text
+
+def phrase_span(words, phrase):
+    """Vosk word entries covering the last occurrence of `phrase` in the utterance ([] if absent)."""
+    text = " ".join(w.get("word", "") for w in words)
+    i = text.rfind(phrase)
+    if i < 0:
+        return []
+    span, pos = [], 0
+    for w in words:
+        end = pos + len(w.get("word", ""))
+        if pos < i + len(phrase) and end > i:
+            span.append(w)
+        pos = end + 1
+    return span
+
+class WakeDetector:
+    """
+    Vosk wake-phrase spotting behind an energy gate: silent blocks never reach
+    the recognizer, so an idle room costs one RMS per block.
+    """
+    def __init__(self, model, gate=GATE_ENABLED, mode=None, grammar=None):
+        if mode is None:
+            mode, config_grammar = load_wake_config()
+            grammar = grammar or config_grammar
+        self.mode = mode
+        if mode == "grammar":
+            # Only the wake phrases (and "anything else") can be decoded
+            self.phrases = list(grammar or WAKE_GRAMMAR)
+            self.rec = vosk.KaldiRecognizer(model, SAMPLE_RATE, json.dumps(self.phrases + ["[unk]"]))
+        else:
+            self.phrases = WAKE_PHRASES
+            self.rec = vosk.KaldiRecognizer(model, SAMPLE_RATE)
+        self.rec.SetWords(True)  # Per-word confidence and timing for the wake verifier / pre-roll
+        self.words = []          # Vosk word results of the last detection
+        self.phrase = None       # Wake phrase matched by the last detection
+        self.phrase_words = []   # Its entries in self.words
+        self.gate = vad.EnergyGate(block_seconds=capture.BLOCK_SIZE / SAMPLE_RATE) if gate else None
+        self.lead_in = deque(maxlen=GATE_LEAD_IN_BLOCKS)  # (block, capture block number)
+        self.decoded_samples = 0  # Samples fed to Vosk so far (its word times count these)
+        self.decoded = deque(maxlen=DECODE_HISTORY_BLOCKS)  # (first sample, end sample, capture block number)
+        self.partial = ""
+        self.level = 0.0
+        self.stats = {"blocks": 0, "decoded": 0}
+
+    @property
+    def active(self):
+        """True while audio is being decoded (gate open or no gate)."""
+        return self.gate is None or self.gate.is_open
+
+    def _match(self, text):
+        """Longest wake phrase contained in text, or None."""
+        found = [phrase for phrase in self.phrases if phrase in text]
+        return max(found, key=len) if found else None
+
+    def _decode(self, block, seq=None):
+        """Feeds one block to Vosk. Returns the text if it contains a wake phrase."""
+        self.stats["decoded"] += 1
+        self.decoded.append((self.decoded_samples, self.decoded_samples + len(block), seq))
+        self.decoded_samples += len(block)
+        if self.rec.AcceptWaveform(block.tobytes()):
+            self.partial = ""
+            # If we get a final result, check it immediately
+            return self._check_final(self.rec.Result())
+        self.partial = json.loads(self.rec.PartialResult()).get("partial", "").lower()
+        if self._match(self.partial):
+            # Finalize now (instead of Reset) to get word confidences for verification
+            self.partial = ""
+            return self._check_final(self.rec.FinalResult())
+        return None
+
+    def _check_final(self, result_json):
+        res = json.loads(result_json)
+        text = res.get("text", "").lower()
+        phrase = self._match(text)
+        if phrase:
+            self.words = res.get("result", [])
+            self.phrase = phrase
+            self.phrase_words = phrase_span(self.words, phrase)
+            return text
+        return None
+
+    def phrase_end_block(self):
+        """Capture block in which the last detected wake phrase ended, or None if unknown."""
+        if not self.phrase_words or "end" not in self.phrase_words[-1]:
+            return None
+        sample = int(self.phrase_words[-1]["end"] * SAMPLE_RATE)
+        for first, end, seq in self.decoded:
+            if first <= sample < end:
+                return seq
+        return None
+
+    def process(self, block, seq=None):
+        """
+        Returns the heard text if this block completed a wake phrase, else None.
+        seq: the block's capture block number (lets phrase_end_block() map word times).
+        """
+        self.stats["blocks"] += 1
+        if self.gate is None:
+            self.level = vad.block_rms(block)
+            return self._decode(block, seq)
+
+        was_open = self.gate.is_open
+        self.level = 0.0
+        if not self.gate.update(block):
+            self.lead_in.append((block, seq))
+            if was_open:
+                # Speech just ended: flush Vosk so the last words get a final result
+                self.partial = ""
+                return self._check_final(self.rec.FinalResult())
+            return None
+
+        self.level = self.gate.level
+        blocks = list(self.lead_in) + [(block, seq)] if not was_open else [(block, seq)]
+        self.lead_in.clear()
+        # Quiet lead-in blocks go first so the onset of "hey" isn't clipped
+        for b, b_seq in blocks:
+            text = self._decode(b, b_seq)
+            if text:
+                return text
+        return None
+
+    def resume(self):
+        """
+        Starts a new wake loop: drops any half-heard utterance from before the
+        last command, but keeps the noise floor the gate has learned.
+        """
+        self.rec.Reset()
+        self.partial = ""
+        self.lead_in.clear()
+        if self.gate is not None:
+            self.gate.reset()
+
+    def get_stats(self):
+        s = dict(self.stats)
+        s["decode_ratio"] = s["decoded"] / s["blocks"] if s["blocks"] else 0.0
+        if self.gate is not None:
+            s["gate"] = self.gate.get_stats()
+        return s
+
+def get_detector(model):
+    """The wake detector for this Vosk model (built, and voice_config.json read, on first use)."""
+    detector = _detectors.get(model)
+    if detector is None:
+        detector = _detectors[model] = WakeDetector(model)
+    return detector
+
+def listen_for_wake_word(model, input_device_index=None, verifier=None):
+    """
+    Blocks until the wake word (returns True) or typed GUI input (returns the text).
+    verifier: optional WakeVerifier (core/wake_verify.py) run on each detection.
+    """
+    global last_wake_block, last_wake_end_block
+    detector = get_detector(model)
+    detector.resume()
     
-    print(f"{Fore.YELLOW}[WAKE] Listening... (Say 'A1' or 'Hey A1'){Style.RESET_ALL}")
+    print(f"{Fore.YELLOW}[WAKE] Listening ({detector.mode})... (Say 'A1' or 'Hey A1'){Style.RESET_ALL}")
 
-    with sd.RawInputStream(samplerate=SAMPLE_RATE, blocksize=BLOCK_SIZE, device=input_device_index, dtype='int16',
-                           channels=1, callback=None) as stream:
+    # Audio comes from the shared capture engine (one mic stream for the whole process)
+    with capture.get_capture(device=input_device_index).subscribe("wake") as stream:
         
+        meter_shown = False
         while True:
-            data, overflowed = stream.read(BLOCK_SIZE)
-            
-            # --- CHECK GUI INPUT ---
-            if os.path.exists("gui_input.txt"):
-                 try:
-                     with open("gui_input.txt", "r") as f:
-                         gui_text = f.read().strip()
-                     os.remove("gui_input.txt")
-                     if gui_text:
-                         sys.stdout.write("\r" + " " * 80 + "\r")
-                         print(f"{Fore.GREEN}[GUI INPUT]: {gui_text}{Style.RESET_ALL}")
-                         return gui_text # Return text directly
-                 except: pass
-
-            # --- VU METER & DEBUG ---
-            audio_data = np.frombuffer(data, dtype=np.int16)
-            volume = np.linalg.norm(audio_data) / len(audio_data)
-            bars = "█" * int(volume // 50)
-            
-            # Get partial for debug
-            partial_check = ""
-            if rec.AcceptWaveform(bytes(data)):
-                res = json.loads(rec.Result())
-                text = res.get("text", "").lower()
-                # If we get a final result, check it immediately
-                if any(phrase in text for phrase in WAKE_PHRASES):
-                     sys.stdout.write("\r" + " " * 80 + "\r")
-                     print(f"{Fore.GREEN}[WAKE] Wake word detected: '{text}'{Style.RESET_ALL}")
-                     return True
-            else:
-                partial = json.loads(rec.PartialResult())
-                partial_check = partial.get("partial", "").lower()
-                if any(phrase in partial_check for phrase in WAKE_PHRASES):
-                    rec.Reset()
-                    sys.stdout.write("\r" + " " * 80 + "\r")
-                    print(f"{Fore.GREEN}[WAKE] Wake word detected (Partial): '{partial_check}'{Style.RESET_ALL}")
-                    return True
-
-            # Print Meter + What it hears
-            debug_text = f"Heard: '{partial_check}'" if partial_check else "..."
-            sys.stdout.write(f"\r{Fore.CYAN}[MIC] {bars:<10} {Style.DIM}{debug_text:<40}{Style.RESET_ALL}")
-            sys.stdout.flush()
-            # ------------------------
+            # --- CHECK GUI INPUT (typed text wins over the wake word) ---
+            gui_text = text_input.poll()
+            if gui_text:
+                sys.stdout.write("\r" + " " * 80 + "\r")
+                print(f"{Fore.GREEN}[GUI INPUT]: {gui_text}{Style.RESET_ALL}")
+                return gui_text # Return text directly
+
+            data = stream.read(timeout=0.2)
+
+            if data is None:
+                continue
+
+            text = detector.process(data, stream.next_block - 1)
+            if text:
+                wake_block = stream.next_block - 1
+                sys.stdout.write("\r" + " " * 80 + "\r")
+                if verifier is not None:
+                    segment = stream.engine.copy_blocks(wake_block + 1 - capture.blocks_for(WAKE_SEGMENT_SECONDS),
+                                                        wake_block + 1)
+                    accepted, info = verifier.verify(segment, detector.phrase_words, detector.phrase, SAMPLE_RATE)
+                    if not accepted:
+                        print(f"{Fore.YELLOW}[WAKE] Ignored '{text}': {info['reason']}{Style.RESET_ALL}")
+                        continue
+                last_wake_block = wake_block
+                last_wake_end_block = detector.phrase_end_block()
+                print(f"{Fore.GREEN}[WAKE] Wake word detected: '{text}'{Style.RESET_ALL}")
+                return True
+
+            # --- VU METER & DEBUG (only while there is something to show) ---
+            if detector.active:
+                bars = "█" * int(detector.level // 50)
+                debug_text = f"Heard: '{detector.partial}'" if detector.partial else "..."
+                sys.stdout.write(f"\r{Fore.CYAN}[MIC] {bars:<10} {Style.DIM}{debug_text:<40}{Style.RESET_ALL}")
+                sys.stdout.flush()
+                meter_shown = True
+            elif meter_shown:
+                sys.stdout.write("\r" + " " * 80 + "\r")
+                sys.stdout.flush()
+                meter_shown = False
+
+# Benchmark configurations: (label, mode, gate)
+BENCH_CONFIGS = [
+    ("free, gate off", "free", False),
+    ("free, gate on", "free", True),
+    ("grammar, gate on", "grammar", True),
+]
+
+def _load_wav(path):
+    """Reads a 16 kHz mono 16-bit WAV into an int16 array."""
+    import wave
+    with wave.open(path, "rb") as w:
+        if w.getframerate() != SAMPLE_RATE or w.getnchannels() != 1 or w.getsampwidth() != 2:
+            raise ValueError(f"{path}: need 16 kHz mono 16-bit PCM")
+        return np.frombuffer(w.readframes(w.getnframes()), dtype=np.int16)
+
+def benchmark_file(model, path, wake_end=None, configs=BENCH_CONFIGS):
+    """
+    Replays a recording through each detector configuration as fast as possible.
+    Reports CPU per second of audio and, if the recording contains a wake phrase
+    ending at `wake_end` seconds, the detection latency (audio still needed after
+    the phrase ended + time spent decoding the triggering block).
+    """
+    audio = _load_wav(path)
+    block = capture.BLOCK_SIZE
+    audio_seconds = len(audio) / SAMPLE_RATE
+    results = {}
+    for label, mode, gate in configs:
+        detector = WakeDetector(model, gate=gate, mode=mode)
+        detected_at = None
+        cpu_start = time.process_time()
+        for start in range(0, len(audio) - block + 1, block):
+            t0 = time.perf_counter()
+            text = detector.process(audio[start:start + block])
+            if text and detected_at is None:
+                block_end = (start + block) / SAMPLE_RATE
+                detected_at = (block_end, time.perf_counter() - t0, text)
+                if wake_end is not None:
+                    break  # Latency measured; the rest would only count toward CPU
+        cpu = time.process_time() - cpu_start
+        processed = detector.stats["blocks"] * block / SAMPLE_RATE
+        result = {
+            "cpu_per_audio_second": cpu / processed if processed else 0.0,
+            "decode_ratio": detector.get_stats()["decode_ratio"],
+            "detected": detected_at[2] if detected_at else None,
+            "latency": None,
+        }
+        line = f"{label:<18} {1000 * result['cpu_per_audio_second']:7.1f} ms CPU / audio s"
+        if detected_at:
+            if wake_end is not None:
+                result["latency"] = detected_at[0] - wake_end + detected_at[1]
+                line += f"   latency {1000 * result['latency']:6.0f} ms"
+            line += f"   heard '{detected_at[2]}' at {detected_at[0]:.1f}s"
+        else:
+            line += "   no wake"
+        results[label] = result
+        print(f"{Fore.CYAN}[WAKE BENCH] {line}{Style.RESET_ALL}")
+    print(f"{Fore.CYAN}[WAKE BENCH] {os.path.basename(path)}: {audio_seconds:.1f}s of audio{Style.RESET_ALL}")
+    return results
+
+def benchmark(model, seconds=20, configs=BENCH_CONFIGS):
+    """
+    Runs each detector configuration on the live mic for `seconds` and prints
+    process CPU time per second of audio. Stay quiet to measure the idle baseline.
+    """
+    results = {}
+    for label, mode, gate in configs:
+        detector = WakeDetector(model, gate=gate, mode=mode)
+        with capture.subscribe("wake-bench") as stream:
+            wall_start, cpu_start = time.time(), time.process_time()
+            while time.time() - wall_start < seconds:
+                block = stream.read(timeout=1.0)
+                if block is not None:
+                    detector.process(block)
+            cpu = time.process_time() - cpu_start
+        audio_seconds = detector.stats["blocks"] * capture.BLOCK_SIZE / SAMPLE_RATE
+        stats = detector.get_stats()
+        results[label] = {
+            "cpu_seconds": cpu,
+            "cpu_per_audio_second": cpu / audio_seconds if audio_seconds else 0.0,
+            "decode_ratio": stats["decode_ratio"],
+        }
+        print(f"{Fore.CYAN}[WAKE BENCH] {label:<18} {100 * cpu / seconds:5.1f}% CPU, "
+              f"decoded {stats['decoded']}/{stats['blocks']} blocks{Style.RESET_ALL}")
+    return results
+
+if __name__ == "__main__":
+    # python -m core.wake --bench [seconds]
+    # python -m core.wake --bench-file recording.wav [wake_end_seconds]
+    model_path = os.path.join(BASE_DIR, "models", "vosk-model-small-en-us-0.15")
+    vosk_model = vosk.Model(model_path)
+    if "--bench-file" in sys.argv:
+        idx = sys.argv.index("--bench-file")
+        wake_end = float(sys.argv[idx + 2]) if len(sys.argv) > idx + 2 else None
+        benchmark_file(vosk_model, sys.argv[idx + 1], wake_end)
+    elif "--bench" in sys.argv:
+        idx = sys.argv.index("--bench")
+        seconds = float(sys.argv[idx + 1]) if len(sys.argv) > idx + 1 else 20
+        benchmark(vosk_model, seconds)
+    else:
+        print(listen_for_wake_word(vosk_model))
+    capture.stop()
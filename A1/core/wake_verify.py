@@ -0,0 +1,118 @@
+"""
+A1 Wake Verification
+Second stage run on the wake segment itself, before any TTS or Whisper:
+
+1. Vosk word confidence of the wake phrase (free, already computed)
+2. Speaker similarity of the segment to the closest enrolled voice
+   (core/speaker_registry.py; ECAPA, ~1 s of audio)
+
+A wake that fails either check is dropped and the wake loop keeps listening.
+Counters in get_stats() show how many wakes were accepted / rejected and why,
+so the thresholds in voice_config.json can be tuned.
+"""
+
+import os
+import sys
+import json
+import time
+from colorama import Fore, Style
+
+# Import core modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from core.speaker_registry import SpeakerRegistry
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CONFIG_PATH = os.path.join(BASE_DIR, "voice_config.json")
+
+# Defaults (voice_config.json: wake_verify, wake_min_confidence, wake_min_similarity)
+MIN_CONFIDENCE = 0.6
+MIN_SIMILARITY = 0.15  # Lower than the command threshold: the wake segment is short
+
+class WakeVerifier:
+    def __init__(self, encoder_provider=None):
+        """
+        encoder_provider: callable returning the loaded SpeakerEncoder, or None while
+        it's still loading (the speaker check is skipped until then).
+        """
+        config = self._load_config()
+        self.enabled = config.get("wake_verify", True)
+        self.min_confidence = config.get("wake_min_confidence", MIN_CONFIDENCE)
+        self.min_similarity = config.get("wake_min_similarity", MIN_SIMILARITY)
+        self.speakers = SpeakerRegistry(config, writable=False)
+        self.encoder_provider = encoder_provider
+        self.stats = {
+            "accepted": 0,
+            "rejected_confidence": 0,
+            "rejected_speaker": 0,
+            "speaker_skipped": 0,  # Encoder not loaded yet, or nobody enrolled
+        }
+
+    def _load_config(self):
+        if os.path.exists(CONFIG_PATH):
+            try:
+                with open(CONFIG_PATH, 'r') as f:
+                    return json.load(f)
+            except Exception as e:
+                print(f"{Fore.RED}[WAKE VERIFY] Could not read config: {e}{Style.RESET_ALL}")
+        return {}
+
+    @staticmethod
+    def phrase_confidence(words):
+        """
+        Mean Vosk confidence of the wake phrase.
+        words: Vosk "result" entries ({"word", "conf", ...}) of just the matched
+        phrase (WakeDetector.phrase_words). None if there are none.
+        """
+        if not words:
+            return None
+        return sum(w.get("conf", 0.0) for w in words) / len(words)
+
+    def verify(self, audio, words, phrase, sample_rate=16000):
+        """
+        Returns (accepted, info). info has "confidence", "similarity" and "reason".
+        audio: int16 samples of the wake segment.
+        words: Vosk entries of the matched wake phrase (phrase).
+        """
+        info = {"phrase": phrase, "confidence": None, "similarity": None, "speaker": None, "reason": None}
+        if not self.enabled:
+            self.stats["accepted"] += 1
+            return True, info
+
+        # 1. Recognizer confidence (no extra compute)
+        confidence = self.phrase_confidence(words)
+        info["confidence"] = confidence
+        if confidence is not None and confidence < self.min_confidence:
+            info["reason"] = f"confidence {confidence:.2f} < {self.min_confidence:.2f}"
+            self.stats["rejected_confidence"] += 1
+            return False, info
+
+        # 2. Speaker similarity against the enrolled profile
+        encoder = self.encoder_provider() if self.encoder_provider else None
+        if encoder is not None:
+            self.speakers.refresh()  # Two stats unless a profile was written since the last check
+        start = time.time()
+        emb = None
+        if encoder is not None and len(self.speakers) and len(audio):
+            emb = encoder.embed_array(audio, sample_rate)
+        if emb is None:
+            # Nothing to compare against (or the embedding failed): confidence alone decides
+            self.stats["speaker_skipped"] += 1
+        else:
+            speaker, similarity = self.speakers.best_match(emb)
+            info["similarity"] = similarity
+            info["speaker"] = speaker
+            print(f"{Fore.MAGENTA}[WAKE VERIFY] Speaker similarity {similarity:.3f} ({speaker}, "
+                  f"{1000 * (time.time() - start):.0f} ms){Style.RESET_ALL}")
+            if similarity < self.min_similarity:
+                info["reason"] = f"similarity {similarity:.2f} < {self.min_similarity:.2f}"
+                self.stats["rejected_speaker"] += 1
+                return False, info
+
+        self.stats["accepted"] += 1
+        return True, info
+
+    def get_stats(self):
+        s = dict(self.stats)
+        total = s["accepted"] + s["rejected_confidence"] + s["rejected_speaker"]
+        s["reject_rate"] = (total - s["accepted"]) / total if total else 0.0
+        return s
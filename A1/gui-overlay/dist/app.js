@@ -169,34 +169,57 @@ document.querySelectorAll('.action-btn').forEach(btn => {
 });
 
 // ============================================================
-// STATE POLLING (BACKEND SYNC)
+// STATE STREAM (BACKEND SYNC)
 // ============================================================
+// The backend pushes an event only when state or captions change (no polling).
 const STATE_SERVER_URL = 'http://127.0.0.1:9877';
-let lastState = 'idle';
-
-async function pollState() {
-    try {
-        const response = await fetch(STATE_SERVER_URL);
-        if (response.ok) {
-            const newState = (await response.text()).trim();
-            if (newState && newState !== lastState) {
-                lastState = newState;
-                setState(newState);
-
-                // Mock captions for demo based on state
-                if (newState === State.LISTENING) {
-                    setCaption('user', 'Listening...');
-                } else if (newState === State.THINKING) {
-                    setCaption('ai', 'Processing request...');
-                }
-            }
+let lastSession = null;
+let lastVersion = -1;
+let lastUserText = '';
+let lastAiText = '';
+
+function applyUpdate(update) {
+    // A restarted backend starts counting from 0 again
+    if (update.session !== lastSession) {
+        lastSession = update.session;
+        lastVersion = -1;
+    }
+    if (update.version <= lastVersion) return;
+    lastVersion = update.version;
+
+    if (update.state && update.state !== currentState) {
+        setState(update.state);
+
+        // Placeholder captions until real ones arrive
+        if (update.state === State.LISTENING && !update.user_text) {
+            setCaption('user', 'Listening...');
+        } else if (update.state === State.THINKING && !update.ai_text) {
+            setCaption('ai', 'Processing request...');
         }
-    } catch (e) {
-        // Ignored
     }
+    if (update.user_text && update.user_text !== lastUserText) {
+        lastUserText = update.user_text;
+        setCaption('user', update.user_text);
+    }
+    if (update.ai_text && update.ai_text !== lastAiText) {
+        lastAiText = update.ai_text;
+        setCaption('ai', update.ai_text);
+    }
+}
+
+function connectStateStream() {
+    // EventSource reconnects on its own (the server sets the retry delay)
+    const source = new EventSource(`${STATE_SERVER_URL}/events`);
+    source.onmessage = (e) => {
+        try {
+            applyUpdate(JSON.parse(e.data));
+        } catch (err) {
+            console.error('[A1] Bad state event', err);
+        }
+    };
 }
 
-setInterval(pollState, 100);
+connectStateStream();
 
 // Initialize
 setState(State.IDLE);
@@ -1,10 +1,13 @@
+import time
+_T0 = time.time()  # Process start, for the startup readiness timeline
+
 import os
 import sys
 import signal
+import subprocess
 import atexit
 import vosk
 import sounddevice as sd
-import time
 from colorama import init, Fore, Style
 
 # Initialize colorama
@@ -13,24 +16,99 @@ init()
 # Import core modules
 # ... imports ...
 try:
-    from core import wake, listen, listen_whisper, brain, speak, router, vision, adaptive_asr, overlay, memory, hotkeys
-    from skills import app_control, web, arch, foss, weather, personal_assistant, news, automation
+    from core import wake, wake_verify, speak, router, overlay, startup, capture
+    from core.lazy import lazy_import, is_loaded, import_profile
 except ImportError as e:
     print(f"{Fore.RED}Error importing modules: {e}{Style.RESET_ALL}")
     sys.exit(1)
 
+# Heavy modules (torch, whisper, speechbrain, qdrant, mcp, skills...) are
+# imported on first use so the wake word isn't waiting on them.
+# Check with: python main.py --import-profile
+brain = lazy_import("core.brain")
+vision = lazy_import("core.vision")
+adaptive_asr = lazy_import("core.adaptive_asr")
+memory = lazy_import("core.memory")
+hotkeys = lazy_import("core.hotkeys")
+mcp_manager = lazy_import("core.mcp_manager")
+speaker_embed = lazy_import("core.speaker_embed")
+profile_store = lazy_import("core.profile_store")
+app_control = lazy_import("skills.app_control")
+web = lazy_import("skills.web")
+arch = lazy_import("skills.arch")
+foss = lazy_import("skills.foss")
+weather = lazy_import("skills.weather")
+personal_assistant = lazy_import("skills.personal_assistant")
+news = lazy_import("skills.news")
+automation = lazy_import("skills.automation")
+
 # Configuration
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 MODEL_PATH = os.path.join(BASE_DIR, "models", "vosk-model-small-en-us-0.15")
+STARTUP_SOUND = os.path.join(BASE_DIR, "sounds", "startup.oga")
+LISTEN_EARCON = os.path.join(BASE_DIR, "sounds", "listening.oga")  # Built-in chime if missing
+
+# How the wake word is acknowledged: "earcon", "speech" ("Listening." via TTS) or "none".
+# With "earcon"/"none" the command may follow the wake word without a pause (pre-roll).
+WAKE_ACK = "earcon"
+
+# Stream conversational replies into TTS sentence by sentence
+STREAM_RESPONSES = True
+
+# Fixed phrases pre-rendered into the TTS cache at startup
+CACHED_PHRASES = [
+    "Listening.",
+    "Offline.",
+    "System error.",
+    "Systems Online.",
+    "Sensors Disabled.",
+    "A one online. High-Accuracy Mode.",
+    "Checking screen...",
+    "Checking the weather...",
+    "Let me check...",
+    "Fetching the latest headlines.",
+    "Checking tech news.",
+    "Engaging Sentry Protocol.",
+    "Initiating self-optimization logic.",
+]
+
+# Second-stage wake check (created in main, stats printed on exit)
+wake_verifier = None
 
 def cleanup():
-    """Clean up overlay when exiting"""
+    """Clean up overlay, MCP servers, TTS workers and the microphone when exiting"""
     print(f"\n{Fore.YELLOW}[SYSTEM] Cleaning up...{Style.RESET_ALL}")
     try:
         overlay.stop()
         print(f"{Fore.GREEN}[SYSTEM] Overlay stopped.{Style.RESET_ALL}")
     except:
         pass
+    try:
+        if is_loaded("core.mcp_manager"):  # Don't import it just to shut it down
+            mcp_manager.manager.shutdown()
+    except:
+        pass
+    try:
+        speak.shutdown()
+    except:
+        pass
+    try:
+        if is_loaded("core.profile_store"):
+            profile_store.close_all()  # Pending speaker-profile adaptation
+    except:
+        pass
+    if wake_verifier is not None:
+        s = wake_verifier.get_stats()
+        print(f"{Fore.CYAN}[WAKE VERIFY] accepted {s['accepted']}, rejected {s['rejected_confidence']} "
+              f"(confidence) / {s['rejected_speaker']} (speaker){Style.RESET_ALL}")
+    try:
+        stats = capture.get_stats()
+        capture.stop()
+        if stats:
+            print(f"{Fore.CYAN}[CAPTURE] {stats['seconds_captured']:.0f}s captured, "
+                  f"{stats['overflows']} overflows, {stats['dropped_blocks']} dropped blocks{Style.RESET_ALL}")
+    except:
+        pass
 
 def signal_handler(sig, frame):
     """Handle Ctrl+C gracefully"""
@@ -70,6 +148,7 @@ def toggle_listening():
         except: pass
 
 def main():
+    global wake_verifier
     print(f"{Fore.CYAN}========================================")
     print(f"       A1 VOICE ASSISTANT v1.0")
     print(f"========================================{Style.RESET_ALL}")
@@ -90,19 +169,31 @@ def main():
         print(f"{Fore.RED}[SYSTEM] No audio input found: {e}{Style.RESET_ALL}")
         sys.exit(1)
 
-    # 3. Initialize Whisper (Ear)
-    # ear = listen_whisper.Ear()
-    print(f"{Fore.YELLOW}[SYSTEM] Initializing Adaptive AI Ear...{Style.RESET_ALL}")
-    ear = adaptive_asr.AdaptiveEar()
+    # 3. Load everything else in the background (wake word doesn't wait for it)
+    # Loaders are lambdas so the lazy modules are imported on the boot threads
+    boot = startup.StartupOrchestrator(t0=_T0)
+    boot.mark("vosk")
+    boot.add("asr", lambda: adaptive_asr.load_asr())
+    boot.add("ecapa", lambda: speaker_embed.SpeakerEncoder())
+    boot.add("ear", lambda: adaptive_asr.AdaptiveEar(asr_model=boot.get("asr"),
+                                                     speaker_encoder=boot.get("ecapa")),
+             after=["asr", "ecapa"])
+    boot.add("xtts", speak.load_xtts)
+    boot.add("piper", speak.load_piper_voices)
+    boot.add("tts_cache", lambda: speak.prewarm(CACHED_PHRASES), after=["xtts", "piper"])
+    boot.add("memory", lambda: memory.memory.warm_up())
+    boot.add("mcp", lambda: mcp_manager.manager.warm_up())
+    boot.start()
+
+    # Rejects low-confidence / wrong-speaker wakes before TTS and Whisper run
+    wake_verifier = wake_verify.WakeVerifier(encoder_provider=lambda: boot.peek("ecapa"))
 
     # 4. Start Overlay
     overlay.start()
     overlay.idle()
 
-    # 5. Startup Sound
-    overlay.speaking()
-    speak.speak("A one online. High-Accuracy Mode.")
-    overlay.idle()
+    # 5. Startup Sound (earcon - a spoken line would wait on XTTS)
+    speak.play_earcon(STARTUP_SOUND)
 
     # 6. Start Hotkeys
     try:
@@ -112,6 +203,7 @@ def main():
         print(f"{Fore.RED}[HOTKEY ERROR] {e}{Style.RESET_ALL}")
 
     # 7. Main Loop
+    boot.mark("wake_ready")
     while True:
         try:
             # Check Toggle
@@ -120,9 +212,11 @@ def main():
                 continue
 
             # Wait for wake word (Vosk) or GUI Input
-            wake_result = wake.listen_for_wake_word(vosk_model)
+            wake_result = wake.listen_for_wake_word(vosk_model, verifier=wake_verifier)
             
             command_to_process = None
+            preroll_block = None
+            earcon_skip = None
             
             if isinstance(wake_result, str):
                 # Typed Input - Skip "Listening" prompt
@@ -131,10 +225,19 @@ def main():
                 # Wake Word detected! Switch to listening state
                 overlay.listening()
                 
-                # Continuous Conversation Mode
-                next_command = speak.speak("Listening.", vosk_model)
-                if next_command:
-                    command_to_process = next_command
+                if WAKE_ACK == "speech":
+                    # Continuous Conversation Mode
+                    next_command = speak.speak("Listening.", vosk_model)
+                    if next_command:
+                        command_to_process = next_command
+                else:
+                    # Record from the end of the wake phrase so "Hey A1, open firefox" works in one breath
+                    if WAKE_ACK == "earcon":
+                        # The mic hears the earcon too: leave its blocks out of the command audio
+                        earcon_block = capture.current_block()
+                        duration = speak.play_earcon(LISTEN_EARCON)
+                        earcon_skip = (earcon_block, earcon_block + capture.blocks_for(duration) + 1)
+                    preroll_block = wake.preroll_start()
             else:
                 continue
 
@@ -148,7 +251,17 @@ def main():
                 else:
                     # Listen for command (Whisper)
                     overlay.listening()
-                    command = ear.listen(timeout=8)
+                    ear = boot.get("ear")
+                    command = ear.listen(timeout=8, start_block=preroll_block,
+                                         lead_in_end=wake.last_wake_block + 1 if preroll_block is not None else None,
+                                         skip=earcon_skip)
+                    earcon_skip = None
+                    if preroll_block is not None:
+                        preroll_block = None
+                        command = wake.strip_wake_phrase(command)
+                        if command == "":
+                            # Only the wake word itself was caught; wait for the request
+                            command = ear.listen(timeout=8)
                 
                 if command:
                     # Thinking state while processing
@@ -197,13 +310,13 @@ def main():
                         response = weather.should_i_carry_umbrella(args)
                     # --- SYSTEM CONTROL ---
                     elif intent == "system_shutdown":
-                        speak.speak("Shutting down. Goodbye!", vosk_model)
+                        speak.speak("Shutting down. Goodbye!", vosk_model, cache=True)
                         response = arch.shutdown()
                     elif intent == "system_reboot":
-                        speak.speak("Rebooting now. See you soon!", vosk_model)
+                        speak.speak("Rebooting now. See you soon!", vosk_model, cache=True)
                         response = arch.reboot()
                     elif intent == "system_suspend":
-                        speak.speak("Going to sleep. Goodnight!", vosk_model)
+                        speak.speak("Going to sleep. Goodnight!", vosk_model, cache=True)
                         response = arch.suspend()
                     elif intent == "system_lock":
                         response = arch.lock_screen()
@@ -349,6 +462,14 @@ def main():
                             response = "Optimization process started in background."
                         except Exception as e:
                             response = f"Failed to start optimization: {e}"
+                    elif STREAM_RESPONSES:
+                        # Conversation: speak each sentence as soon as the LLM produces it
+                        streamer = speak.StreamingSpeaker(vosk_model)
+                        try:
+                            brain.think(args, on_token=streamer.feed)
+                        finally:
+                            streamer.finish()
+                        response = ""  # Already spoken
                     else:
                         # Conversation
                         response = brain.think(args)
@@ -381,6 +502,9 @@ def main():
     cleanup()
 
 if __name__ == "__main__":
+    if "--import-profile" in sys.argv:
+        atexit.unregister(cleanup)
+        sys.exit(import_profile("main"))
     try:
         main()
     except Exception as e: